@@ -58,6 +58,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'life_cubes.metrics.MetricsMiddleware',  # First, so it times everything below
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
@@ -89,13 +90,106 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE selects a profile:
+#   sqlite      - local development (default)
+#   sqlite-wal  - single-node deployments; WAL lets readers run alongside a writer
+#   postgresql  - production; persistent connections, or a psycopg pool with DB_POOL=true
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'life_cubes'),
+            'USER': os.getenv('DB_USER', 'postgres'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
+    if os.getenv('DB_POOL', 'False').lower() == 'true':
+        # psycopg 3 pool shared by the worker's threads; Django requires
+        # persistent connections to be off when pooling.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        }
+else:
+    # Seconds a connection waits for a lock before "database is locked".
+    DB_SQLITE_TIMEOUT = int(os.getenv('DB_SQLITE_TIMEOUT', '20'))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': DB_SQLITE_TIMEOUT,
+            },
+        }
+    }
+    if DB_ENGINE == 'sqlite-wal':
+        DATABASES['default']['OPTIONS'].update({
+            # busy_timeout (milliseconds) replaces the ``timeout`` lock wait when
+            # init_command runs, so it is derived from the same setting.
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                f'PRAGMA busy_timeout={DB_SQLITE_TIMEOUT * 1000};'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+            # Take the write lock when a transaction starts so concurrent
+            # writers queue on busy_timeout instead of failing mid-transaction.
+            'transaction_mode': 'IMMEDIATE',
+        })
+
+# Caches
+# The 'responses' cache holds per-user API payloads keyed on a data version
+# that is bumped whenever the user's events or tags change. Every process
+# must see the same versions, so the in-process LRU cache is only the
+# default for a single worker: REDIS_URL selects Redis, and otherwise more
+# than one worker (WEB_CONCURRENCY, as read by gunicorn and uvicorn) falls
+# back to the database cache table (`manage.py createcachetable`).
+# RESPONSE_CACHE_BACKEND overrides the choice.
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    _default_response_cache = 'django.core.cache.backends.redis.RedisCache'
+elif WEB_CONCURRENCY > 1:
+    _default_response_cache = 'django.core.cache.backends.db.DatabaseCache'
+else:
+    _default_response_cache = 'life_cubes.cache.BoundedLRUCache'
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', _default_response_cache)
+
+_default_response_cache_locations = {
+    'django.core.cache.backends.redis.RedisCache': REDIS_URL,
+    'django.core.cache.backends.db.DatabaseCache': 'life_cubes_response_cache',
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': RESPONSE_CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'RESPONSE_CACHE_LOCATION',
+            _default_response_cache_locations.get(RESPONSE_CACHE_BACKEND, 'life-cubes-responses'),
+        ),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', '3600')),
+    },
+}
+
+if RESPONSE_CACHE_BACKEND == 'life_cubes.cache.BoundedLRUCache':
+    CACHES['responses']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '5000')),
+        'MAX_BYTES': int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -196,11 +290,35 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_SAMESITE': None,  # Changed from 'Lax' to None for development
 }
 
+# Expired refresh tokens are pruned every TOKEN_PRUNE_INTERVAL seconds by a
+# background thread in each process (0 disables it; use
+# `manage.py prune_tokens` from cron instead).
+TOKEN_PRUNE_INTERVAL = int(os.getenv('TOKEN_PRUNE_INTERVAL', '0'))
+# Number of known-blacklisted token ids kept in memory per process.
+TOKEN_BLACKLIST_CACHE_SIZE = int(os.getenv('TOKEN_BLACKLIST_CACHE_SIZE', '10000'))
+
+# Tombstones of deleted events are kept this many days for the change feed;
+# clients whose sync cursor predates a pruned tombstone must do a full sync.
+# Prune them with `manage.py prune_tombstones` from cron.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '90'))
+# Changes younger than this many seconds are held back from the change feed,
+# so a write that commits late cannot land behind a cursor already handed out.
+SYNC_CHANGE_LAG_SECONDS = int(os.getenv('SYNC_CHANGE_LAG_SECONDS', '5'))
+
+# Number of users whose tag autocomplete index is kept in memory per process.
+TAG_SUGGEST_CACHE_SIZE = int(os.getenv('TAG_SUGGEST_CACHE_SIZE', '1000'))
+
+# Users resolved from JWTs are cached for this many seconds (0 disables).
+# Use a shared cache alias when running several workers so deactivation and
+# password changes are seen everywhere before the timeout.
+AUTH_USER_CACHE_ALIAS = os.getenv('AUTH_USER_CACHE_ALIAS', 'default')
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60'))
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'life_cubes.authentication.CustomJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -208,4 +326,47 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'EXCEPTION_HANDLER': 'life_cubes.utils.custom_exception_handler',
+    # orjson-backed when installed, stdlib json otherwise; same output either way.
+    'DEFAULT_RENDERER_CLASSES': [
+        'life_cubes.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'life_cubes.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
+
+# Request metrics, served at /metrics in the Prometheus text format.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+# When set, /metrics requires "Authorization: Bearer <token>". Without a
+# token it only answers clients in METRICS_ALLOWED_NETWORKS (loopback by default).
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_NETWORKS = [
+    network.strip()
+    for network in os.getenv('METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128').split(',')
+    if network.strip()
+]
+# Requests slower than this are logged with their slowest queries, and this
+# fraction of them also with the plan of the slowest query.
+METRICS_SLOW_REQUEST_SECONDS = float(os.getenv('METRICS_SLOW_REQUEST_SECONDS', '0.5'))
+METRICS_PLAN_SAMPLE_RATE = float(os.getenv('METRICS_PLAN_SAMPLE_RATE', '0.1'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'life_cubes': {
+            'handlers': ['console'],
+            'level': os.getenv('LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+# Keyset pagination of the events list (opt-in via ?cursor= or ?page_size=)
+EVENTS_PAGE_SIZE = int(os.getenv('EVENTS_PAGE_SIZE', '500'))
+EVENTS_MAX_PAGE_SIZE = int(os.getenv('EVENTS_MAX_PAGE_SIZE', '1000'))
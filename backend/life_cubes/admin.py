@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, Tag, Event
+from .models import UserProfile, Tag, Event, EventTombstone, UserStats
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -9,8 +9,8 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ('name', 'created_at')
-    search_fields = ('name',)
+    list_display = ('name', 'user', 'usage_count', 'created_at')
+    search_fields = ('name', 'user__username')
     ordering = ('name',)
 
 @admin.register(Event)
@@ -20,3 +20,16 @@ class EventAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description', 'user__username')
     filter_horizontal = ('tags',)
     ordering = ('week_index', 'day_of_week')
+
+@admin.register(EventTombstone)
+class EventTombstoneAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'user', 'deleted_at')
+    list_filter = ('deleted_at',)
+    search_fields = ('user__username',)
+    ordering = ('-deleted_at',)
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total_events', 'total_tags', 'first_week', 'last_week', 'updated_at')
+    search_fields = ('user__username',)
+    readonly_fields = ('updated_at',)
@@ -0,0 +1,57 @@
+from django.db.models import Count, F, IntegerField, ExpressionWrapper
+
+from .models import WEEKS_PER_YEAR, Event
+
+YEARS_PER_DECADE = 10
+
+
+def week_bucket(weeks):
+    """``week_index`` integer-divided into buckets of ``weeks`` weeks."""
+    return ExpressionWrapper(F('week_index') / weeks, output_field=IntegerField())
+
+
+# Grouping name -> expression evaluated by the database.
+AGGREGATE_GROUPS = {
+    'week': F('week_index'),
+    'year': week_bucket(WEEKS_PER_YEAR),
+    'decade': week_bucket(WEEKS_PER_YEAR * YEARS_PER_DECADE),
+    'day_of_week': F('day_of_week'),
+}
+AGGREGATE_GROUP_NAMES = (*AGGREGATE_GROUPS, 'tag')
+
+
+def filter_by_tags(queryset, tags):
+    """
+    Keep events carrying any of ``tags`` (names). Uses a subquery on the
+    through table so events with several matching tags are not repeated.
+    """
+    through = Event.tags.through.objects.filter(tag__name__in=tags)
+    return queryset.filter(pk__in=through.values('event_id'))
+
+
+def aggregate_events(queryset, group):
+    """
+    Count events per bucket of ``group`` with a single grouped query.
+
+    Returns ``[{'key': ..., 'count': ...}]`` ordered by key. Tag buckets are
+    keyed by tag id, also carry the tag ``name`` and are ordered by name.
+    """
+    queryset = queryset.order_by()
+    if group == 'tag':
+        rows = (
+            queryset.filter(tags__isnull=False)
+            .values('tags__id', 'tags__name')
+            .annotate(count=Count('id'))
+            .order_by('tags__name')
+        )
+        return [
+            {'key': row['tags__id'], 'name': row['tags__name'], 'count': row['count']}
+            for row in rows
+        ]
+    rows = (
+        queryset.annotate(key=AGGREGATE_GROUPS[group])
+        .values('key')
+        .annotate(count=Count('id'))
+        .order_by('key')
+    )
+    return [{'key': row['key'], 'count': row['count']} for row in rows]
@@ -5,3 +5,13 @@ class LifeCubesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "life_cubes"
     verbose_name = "Life in Cubes"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metrics import install_query_recorder
+        from .tokens import start_token_pruning
+
+        connection_created.connect(install_query_recorder, dispatch_uid='life_cubes_query_recorder')
+        start_token_pruning()
@@ -0,0 +1,148 @@
+"""
+Async-native versions of the hot read endpoints, for deployments served by
+``core.asgi``. They return the same payloads as their DRF counterparts but
+authenticate and query without tying up a thread per request.
+"""
+from functools import wraps
+
+from django.http import HttpResponse, JsonResponse
+from django.http.response import HttpResponseBase
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .authentication import CustomJWTAuthentication
+from .cache import aresponse_cache_key, response_cache, stats as cache_stats
+from .grid import abuild_grid_summary, grid_summary_to_json, pack_grid_summary
+from .models import Event
+from .serializers import EventListSerializer
+from .stats import aget_user_stats
+
+EVENT_ORDERING = ('week_index', 'day_of_week', 'id')
+EVENT_CHUNK_SIZE = 1000
+
+jwt_authentication = CustomJWTAuthentication()
+
+
+def _error(message, status, code=None, detail=None):
+    return JsonResponse(
+        {'error': message, 'code': code, 'detail': detail or {'detail': message}},
+        status=status,
+    )
+
+
+def async_read_view(scope):
+    """
+    Wrap an async view returning JSON-serializable data: authenticate with
+    a JWT (header or cookie) or the session, then serve the data from the
+    response cache until the user's data version changes. Views may return
+    an ``HttpResponse`` instead, which is passed through uncached.
+    """
+    def decorator(view):
+        @require_safe
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                result = await jwt_authentication.aauthenticate(request)
+            except InvalidToken as exc:
+                return _error('Token is invalid or expired', 401, 'token_invalid', str(exc))
+            except AuthenticationFailed as exc:
+                return _error(str(exc.detail), 401, 'AuthenticationFailed')
+            user = result[0] if result else await request.auser()
+            if not user.is_authenticated:
+                return _error(
+                    'Authentication credentials were not provided.', 401, 'NotAuthenticated'
+                )
+            request.user = user
+
+            cache = response_cache()
+            key = await aresponse_cache_key(request, scope, kwargs)
+            data = await cache.aget(key)
+            if data is not None:
+                cache_stats.record('hits')
+                return JsonResponse(data, safe=False)
+
+            cache_stats.record('misses')
+            data = await view(request, *args, **kwargs)
+            if isinstance(data, HttpResponseBase):
+                return data
+            await cache.aset(key, data)
+            return JsonResponse(data, safe=False)
+        return wrapper
+    return decorator
+
+
+def _int_params(request, *names):
+    """Parse optional integer query parameters; raises ``ValueError``."""
+    return [
+        int(request.GET[name]) if request.GET.get(name) else None
+        for name in names
+    ]
+
+
+async def _serialize_events(queryset):
+    events = queryset.with_tags().order_by(*EVENT_ORDERING)
+    events = [event async for event in events.aiterator(chunk_size=EVENT_CHUNK_SIZE)]
+    return EventListSerializer(events, many=True).data
+
+
+@async_read_view('async-events')
+async def event_list(request):
+    """Async ``GET /events/``, filterable by ``week_index`` and ``day_of_week``."""
+    try:
+        week_index, day_of_week = _int_params(request, 'week_index', 'day_of_week')
+    except ValueError:
+        return _error('week_index and day_of_week must be integers', 400)
+    queryset = Event.objects.for_user(request.user)
+    if week_index is not None:
+        queryset = queryset.filter(week_index=week_index)
+    if day_of_week is not None:
+        queryset = queryset.filter(day_of_week=day_of_week)
+    return await _serialize_events(queryset)
+
+
+@async_read_view('async-week-range')
+async def event_week_range(request):
+    """Async ``GET /events/week_range/``."""
+    try:
+        start_week, end_week = _int_params(request, 'start_week', 'end_week')
+    except ValueError:
+        return _error('start_week and end_week must be integers', 400)
+    if start_week is None or end_week is None:
+        return _error('Both start_week and end_week parameters are required', 400)
+    queryset = Event.objects.for_user(request.user).filter(
+        week_index__gte=start_week,
+        week_index__lte=end_week,
+    )
+    return await _serialize_events(queryset)
+
+
+@async_read_view('async-grid')
+async def event_grid(request):
+    """Async ``GET /events/grid/``; ``?format=bin`` returns the packed encoding."""
+    summary = await abuild_grid_summary(Event.objects.for_user(request.user))
+    if request.GET.get('format') == 'bin':
+        return HttpResponse(pack_grid_summary(summary), content_type='application/octet-stream')
+    return grid_summary_to_json(summary)
+
+
+@async_read_view('async-dashboard')
+async def dashboard(request):
+    """Async ``GET /dashboard/``."""
+    user = request.user
+    stats = await aget_user_stats(user)
+    recent_events = Event.objects.for_user(user).with_tags().order_by('-created_at')[:5]
+    recent_events = [event async for event in recent_events]
+    return {
+        'user': {
+            'username': user.username,
+            'email': user.email,
+        },
+        'recent_events': EventListSerializer(recent_events, many=True).data,
+        'tags': stats.tags,
+        'total_events': stats.total_events,
+        'total_tags': stats.total_tags,
+        'first_week': stats.first_week,
+        'last_week': stats.last_week,
+        'events_per_year': stats.events_per_year,
+    }
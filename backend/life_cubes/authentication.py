@@ -1,19 +1,31 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.conf import settings
+from django.core.cache import caches
 from rest_framework.authentication import CSRFCheck
 from rest_framework import exceptions
-from django.middleware.csrf import CsrfViewMiddleware
+
+# The CSRF checker keeps no per-request state, so one instance is shared.
+_csrf_check = CSRFCheck(lambda request: None)
 
 def enforce_csrf(request):
     """
     Enforce CSRF validation for session based authentication.
     """
-    check = CSRFCheck(CsrfViewMiddleware)
-    check.process_request(request)
-    reason = check.process_view(request, None, (), {})
+    _csrf_check.process_request(request)
+    reason = _csrf_check.process_view(request, None, (), {})
     if reason:
         raise exceptions.PermissionDenied('CSRF Failed: %s' % reason)
 
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+def forget_cached_user(user_id):
+    """Drop a user from the authentication cache after it changed."""
+    caches[settings.AUTH_USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
 class CustomJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
         header = self.get_header(request)
@@ -38,5 +50,74 @@ class CustomJWTAuthentication(JWTAuthentication):
 
         return self.get_user(validated_token), validated_token
 
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user from a short-lived cache, falling back to the
+        database. Cached users are dropped when the user is saved or deleted,
+        which covers password changes and deactivation; cache hits go through
+        the same active and revocation checks as database lookups.
+        """
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if not timeout or user_id is None:
+            return super().get_user(validated_token)
+
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout)
+            return user
+        return self.check_user(user, validated_token)
+
+    def check_user(self, user, validated_token):
+        """Apply simplejwt's active user and revoked token checks to ``user``."""
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed('User is inactive', code='user_inactive')
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise exceptions.AuthenticationFailed(
+                "The user's password has been changed.", code='password_changed'
+            )
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of ``authenticate`` for async views. Only serves
+        safe methods, so no CSRF check is needed for cookie tokens.
+        """
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header else None
+        if raw_token is None:
+            access_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE'])
+            if not access_token:
+                return None
+            raw_token = access_token.encode()
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Async ``get_user``, sharing its cache."""
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        user = await cache.aget(key) if timeout else None
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise exceptions.AuthenticationFailed('User not found', code='user_not_found')
+            if timeout:
+                await cache.aset(key, user, timeout)
+        return self.check_user(user, validated_token)
+
     def authenticate_header(self, request):
         return 'Bearer realm="api"' 
\ No newline at end of file
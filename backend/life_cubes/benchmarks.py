@@ -0,0 +1,304 @@
+"""
+Microbenchmarks for the app's hot code paths.
+
+Each benchmark is a setup function returning the zero-argument operation to
+measure. Timing calibrates a loop count per benchmark and keeps the best of
+several rounds; allocations are traced separately with ``tracemalloc`` so
+tracing does not skew the timings. Results can be saved as a baseline and
+later runs compared against it, flagging slowdowns and allocation growth
+beyond a tolerance.
+"""
+import gc
+import logging
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import Http404
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CustomJWTAuthentication
+from .bulk import BULK_MAX_EVENTS, bulk_create_events
+from .cache import response_cache
+from .models import Event, UserProfile
+from .projections import project_events
+from .serializers import EventListSerializer, EventSerializer, TagSerializer
+from .stats import get_user_stats
+from .synthetic import generate_events
+from .utils import custom_exception_handler
+from .views import DashboardView, TagViewSet
+
+# Events created for the benchmark user; the largest serialization size.
+FIXTURE_EVENTS = 10000
+FIXTURE_CURRENT_WEEK = 2000
+CREATE_TAG_COUNT = 25
+# Target duration of one timed round, and the number of rounds kept.
+ROUND_SECONDS = 0.2
+ROUNDS = 5
+# Relative change beyond which a benchmark is flagged against the baseline.
+DEFAULT_TOLERANCE = 0.25
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+class Fixture:
+    """The benchmark user and their events, created once per run."""
+
+    def __init__(self, seed=0, events=FIXTURE_EVENTS):
+        rng = random.Random(seed)
+        self.user = User.objects.create_user(
+            'benchmark', 'benchmark@example.com', 'benchmark-pass-1'
+        )
+        UserProfile.objects.create(user=self.user)
+        events = generate_events(rng, FIXTURE_CURRENT_WEEK, events)
+        for offset in range(0, len(events), BULK_MAX_EVENTS):
+            bulk_create_events(self.user, events[offset:offset + BULK_MAX_EVENTS])
+        self.factory = APIRequestFactory()
+
+    def events(self, count):
+        events = Event.objects.for_user(self.user).for_read()
+        return list(events.order_by('week_index', 'day_of_week', 'id')[:count])
+
+    def request(self, path, **extra):
+        request = Request(self.factory.get(path, **extra))
+        request.user = self.user
+        return request
+
+
+def _serialize_events(count):
+    def setup(fixture):
+        events = fixture.events(count)
+        return lambda: EventSerializer(events, many=True).data
+    return setup
+
+
+def _project_events(count):
+    def setup(fixture):
+        events = Event.objects.for_user(fixture.user)
+        events = events.order_by('week_index', 'day_of_week', 'id')[:count]
+        return lambda: project_events(events)
+    return setup
+
+
+for _count in (1, 100, FIXTURE_EVENTS):
+    benchmark(f'event_serialize_{_count}')(_serialize_events(_count))
+for _count in (100, FIXTURE_EVENTS):
+    benchmark(f'event_project_{_count}')(_project_events(_count))
+
+
+@benchmark('event_create_many_tags')
+def event_create(fixture):
+    data = {
+        'week_index': 100,
+        'day_of_week': 3,
+        'title': 'Benchmark event',
+        'description': 'Created by the benchmark suite.',
+        'icon': 'star',
+        'tags': [{'name': f'benchmark-tag-{number}'} for number in range(CREATE_TAG_COUNT)],
+    }
+    request = fixture.request('/api/v1/events/')
+
+    def create():
+        # Roll back so every round creates the event and its tags from scratch.
+        with transaction.atomic():
+            serializer = EventSerializer(data=data, context={'request': request})
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=fixture.user)
+            transaction.set_rollback(True)
+    return create
+
+
+def _authenticate(use_cookie):
+    def setup(fixture):
+        authentication = CustomJWTAuthentication()
+        token = str(AccessToken.for_user(fixture.user))
+        if use_cookie:
+            django_request = fixture.factory.get('/api/v1/events/')
+            django_request.COOKIES[settings.SIMPLE_JWT['AUTH_COOKIE']] = token
+        else:
+            django_request = fixture.factory.get(
+                '/api/v1/events/', HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+        request = Request(django_request)
+        return lambda: authentication.authenticate(request)
+    return setup
+
+
+benchmark('jwt_authenticate_header')(_authenticate(use_cookie=False))
+benchmark('jwt_authenticate_cookie')(_authenticate(use_cookie=True))
+
+
+@benchmark('exception_handler')
+def exception_handler(fixture):
+    exceptions = (
+        ValidationError({'week_index': ['Ensure this value is less than or equal to 4160.']}),
+        InvalidToken('Token is invalid or expired'),
+        Http404(),
+        ValueError('unexpected'),
+    )
+    context = {'request': fixture.request('/api/v1/events/'), 'view': None}
+
+    def handle():
+        for exc in exceptions:
+            custom_exception_handler(exc, context)
+    return handle
+
+
+@benchmark('tag_list_queryset')
+def tag_list_queryset(fixture):
+    view = TagViewSet(request=fixture.request('/api/v1/tags/'), format_kwarg=None, kwargs={})
+    return lambda: TagSerializer(view.get_queryset(), many=True).data
+
+
+def _view(view, path, cached):
+    """
+    Render ``view`` for ``path``, either served from the response cache or
+    computed every time with the cache cleared first.
+    """
+    def setup(fixture):
+        request = fixture.factory.get(path)
+        force_authenticate(request, fixture.user)
+        if cached:
+            return lambda: view(request).render()
+
+        def uncached():
+            response_cache().clear()
+            return view(request).render()
+        return uncached
+    return setup
+
+
+@benchmark('dashboard_queryset')
+def dashboard_queryset(fixture):
+    user = fixture.user
+
+    def dashboard():
+        stats = get_user_stats(user)
+        recent_events = Event.objects.for_user(user).with_tags().order_by('-created_at')[:5]
+        return stats, EventListSerializer(recent_events, many=True).data
+    return dashboard
+
+
+for _cached in (True, False):
+    _suffix = 'cached' if _cached else 'uncached'
+    benchmark(f'tag_list_view_{_suffix}')(
+        _view(TagViewSet.as_view({'get': 'list'}), '/api/v1/tags/', _cached)
+    )
+    benchmark(f'dashboard_view_{_suffix}')(
+        _view(DashboardView.as_view(), '/api/v1/dashboard/', _cached)
+    )
+
+
+@contextmanager
+def _quiet_logging():
+    # The exception handler logs unexpected errors on every call.
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def time_operation(operation, round_seconds=ROUND_SECONDS, rounds=ROUNDS):
+    """Best seconds per call over ``rounds`` rounds of a calibrated loop."""
+    operation()  # warm caches and lazy imports
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        elapsed = time.perf_counter() - started
+        if elapsed >= round_seconds / 10 or loops >= 1 << 20:
+            break
+        loops *= 2
+    best = elapsed / loops
+    loops = max(1, int(loops * round_seconds / max(elapsed, 1e-9)))
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(loops):
+                operation()
+            best = min(best, (time.perf_counter() - started) / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def trace_allocations(operation):
+    """``(peak bytes, retained bytes)`` of one call, measured with tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        result = operation()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak - base, current - base
+
+
+def run_benchmarks(names=None, round_seconds=ROUND_SECONDS, rounds=ROUNDS, seed=0,
+                   fixture_events=FIXTURE_EVENTS):
+    """
+    Run the named benchmarks (all by default) against the current database
+    and return ``{name: {'ops_per_sec', 'mean_us', 'peak_bytes', 'retained_bytes'}}``.
+    """
+    names = names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    fixture = Fixture(seed, fixture_events)
+    results = {}
+    with _quiet_logging():
+        for name in names:
+            operation = BENCHMARKS[name](fixture)
+            seconds = time_operation(operation, round_seconds, rounds)
+            peak_bytes, retained_bytes = trace_allocations(operation)
+            results[name] = {
+                'ops_per_sec': round(1 / seconds, 2),
+                'mean_us': round(seconds * 1e6, 2),
+                'peak_bytes': peak_bytes,
+                'retained_bytes': retained_bytes,
+            }
+    return results
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Benchmarks that got slower, or allocate more, than ``baseline`` by more
+    than ``tolerance``, as ``{name: [description, ...]}``.
+    """
+    regressions = {}
+    for name, values in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        problems = []
+        if values['ops_per_sec'] < previous['ops_per_sec'] * (1 - tolerance):
+            problems.append(f"ops/sec {previous['ops_per_sec']} -> {values['ops_per_sec']}")
+        if values['peak_bytes'] > previous['peak_bytes'] * (1 + tolerance):
+            problems.append(f"peak memory {previous['peak_bytes']} -> {values['peak_bytes']} bytes")
+        if problems:
+            regressions[name] = problems
+    return regressions
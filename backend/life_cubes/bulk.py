@@ -0,0 +1,130 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache import bump_data_version
+from .models import Tag, Event, EventTombstone
+from .search import index_events, remove_events
+from .stats import mark_stats_changed
+
+# Upper bound on the number of events accepted by a single bulk request.
+BULK_MAX_EVENTS = 5000
+
+EventTag = Event.tags.through
+
+_event_ids_field = serializers.ListField(child=serializers.IntegerField(min_value=1))
+
+
+def parse_event_ids(values):
+    """Coerce ``values`` to a list of integer event ids; raises ``ValidationError``."""
+    return _event_ids_field.run_validation(values)
+
+
+def _tag_names(validated_data):
+    return [tag_data['name'] for tag_data in validated_data.get('tags', [])]
+
+
+def _write_event_tags(event_tag_names, tags_by_name):
+    EventTag.objects.bulk_create(
+        [
+            EventTag(event_id=event.pk, tag_id=tags_by_name[name].pk)
+            for event, names in event_tag_names
+            for name in set(names)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def bulk_create_events(user, validated_items):
+    """
+    Create events for ``user`` from validated ``EventSerializer`` data.
+
+    All tag names in the batch are resolved together, events are inserted with
+    one ``bulk_create`` and the event/tag links with another.
+    """
+    with transaction.atomic():
+        tags_by_name = Tag.objects.resolve(
+            user, (name for item in validated_items for name in _tag_names(item))
+        )
+        events = [
+            Event(user=user, **{key: value for key, value in item.items() if key != 'tags'})
+            for item in validated_items
+        ]
+        Event.objects.bulk_create(events)
+        _write_event_tags(
+            [(event, _tag_names(item)) for event, item in zip(events, validated_items)],
+            tags_by_name,
+        )
+        if tags_by_name:
+            Tag.objects.filter(user=user).refresh_usage_counts()
+        index_events([event.pk for event in events])
+        bump_data_version(user.pk)
+        mark_stats_changed(user.pk)
+    return events
+
+
+def bulk_update_events(user, updates):
+    """
+    Apply partial updates to ``user``'s events given as
+    ``(event, validated_data)`` pairs.
+
+    Changed columns are written with one ``bulk_update``. Events whose update
+    carries tags have their tag links replaced, matching
+    ``EventSerializer.update``.
+    """
+    if not updates:
+        return []
+    now = timezone.now()
+    fields = {'updated_at'}
+    retagged = []
+    with transaction.atomic():
+        tags_by_name = Tag.objects.resolve(
+            user, (name for _, data in updates for name in _tag_names(data))
+        )
+        for event, data in updates:
+            for attr, value in data.items():
+                if attr != 'tags':
+                    setattr(event, attr, value)
+                    fields.add(attr)
+            event.updated_at = now
+            if _tag_names(data):
+                retagged.append((event, _tag_names(data)))
+        events = [event for event, _ in updates]
+        Event.objects.bulk_update(events, sorted(fields))
+        if retagged:
+            EventTag.objects.filter(event_id__in=[event.pk for event, _ in retagged]).delete()
+            _write_event_tags(retagged, tags_by_name)
+            Tag.objects.filter(user=user).refresh_usage_counts()
+        index_events([event.pk for event in events])
+        bump_data_version(user.pk)
+        mark_stats_changed(user.pk)
+    return events
+
+
+def bulk_delete_events(queryset, ids):
+    """
+    Delete the events of ``queryset`` whose id is in ``ids`` with a fixed
+    number of queries. The per-event delete signals are bypassed, so their
+    work (tombstones, search index, tag counts, caches and stats) is done
+    here once for the whole set.
+    """
+    with transaction.atomic():
+        events = list(queryset.filter(pk__in=ids).order_by().values_list('pk', 'user_id'))
+        if not events:
+            return 0
+        event_ids = [pk for pk, _ in events]
+        user_ids = {user_id for _, user_id in events}
+        links = EventTag.objects.filter(event_id__in=event_ids)
+        tag_ids = list(links.values_list('tag_id', flat=True).distinct())
+        EventTombstone.objects.bulk_create(
+            [EventTombstone(user_id=user_id, event_id=pk) for pk, user_id in events]
+        )
+        links.delete()
+        # The links are gone and nothing else references events, so a plain
+        # DELETE is safe.
+        Event.objects.filter(pk__in=event_ids)._raw_delete(Event.objects.db)
+        Tag.objects.filter(pk__in=tag_ids).refresh_usage_counts()
+        remove_events(event_ids)
+        bump_data_version(*user_ids)
+        mark_stats_changed(*user_ids)
+    return len(events)
@@ -0,0 +1,229 @@
+import hashlib
+import time
+import uuid
+from functools import wraps
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+# Alias in settings.CACHES holding cached response payloads and the per-user
+# data versions they are keyed on.
+RESPONSE_CACHE_ALIAS = 'responses'
+
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters for the response cache."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def record(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def as_dict(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+stats = CacheStats()
+
+# Pickled entry sizes per named cache, shared like LocMemCache's own storage.
+_usage = {}
+
+
+class _Usage:
+    def __init__(self):
+        self.sizes = {}
+        self.total = 0
+
+    def add(self, key, size):
+        self.sizes[key] = size
+        self.total += size
+
+    def discard(self, key):
+        size = self.sizes.pop(key, 0)
+        self.total -= size
+        return size
+
+    def clear(self):
+        self.sizes.clear()
+        self.total = 0
+
+
+class BoundedLRUCache(LocMemCache):
+    """
+    In-process cache that evicts least recently used entries one at a time
+    once ``MAX_ENTRIES`` or ``OPTIONS['MAX_BYTES']`` (pickled size) would be
+    exceeded. Evictions are counted in ``stats``.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._max_bytes = int(params.get('OPTIONS', {}).get('MAX_BYTES', 0)) or None
+        self._usage = _usage.setdefault(name, _Usage())
+
+    def _set(self, key, value, timeout=None):
+        self._delete(key)
+        while self._cache and (
+            len(self._cache) >= self._max_entries
+            or (self._max_bytes and self._usage.total + len(value) > self._max_bytes)
+        ):
+            self._evict()
+        self._cache[key] = value
+        self._cache.move_to_end(key, last=False)
+        self._expire_info[key] = self.get_backend_timeout(timeout)
+        self._usage.add(key, len(value))
+
+    def _evict(self):
+        key, _ = self._cache.popitem()
+        self._expire_info.pop(key, None)
+        self._usage.discard(key)
+        stats.record('evictions')
+
+    def _delete(self, key):
+        self._usage.discard(key)
+        return super()._delete(key)
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version)
+        self.set(key, value, version=version)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._usage.clear()
+
+
+def response_cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'data-version:{user_id}'
+
+
+def _new_version():
+    return f'{time.time():.6f}-{uuid.uuid4().hex}'
+
+
+def data_version_time(version):
+    """
+    Return when a data version was issued, as a POSIX timestamp, or None for
+    tokens stored before versions carried their issue time.
+    """
+    issued, separator, _ = version.partition('-')
+    return float(issued) if separator else None
+
+
+def get_data_version(user_id):
+    """
+    Return the current data version for a user. Versions are random tokens
+    rather than counters so a lost version key can never resurrect payloads
+    cached under an older one. Each token starts with the time it was issued,
+    which bounds the latest write the version covers.
+    """
+    cache = response_cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = _new_version()
+        if not cache.add(_version_key(user_id), version, timeout=None):
+            version = cache.get(_version_key(user_id), version)
+    return version
+
+
+async def aget_data_version(user_id):
+    """Async ``get_data_version``."""
+    cache = response_cache()
+    version = await cache.aget(_version_key(user_id))
+    if version is None:
+        version = _new_version()
+        if not await cache.aadd(_version_key(user_id), version, timeout=None):
+            version = await cache.aget(_version_key(user_id), version)
+    return version
+
+
+def _set_new_version(user_id):
+    response_cache().set(_version_key(user_id), _new_version(), timeout=None)
+
+
+def bump_data_version(*user_ids):
+    """
+    Invalidate every cached payload of the given users.
+
+    The version changes right away and again once the surrounding transaction
+    commits, so readers cannot cache pre-commit data under the new version.
+    """
+    for user_id in set(user_ids):
+        _set_new_version(user_id)
+        transaction.on_commit(lambda user_id=user_id: _set_new_version(user_id))
+
+
+def _response_cache_key(user_id, version, scope, renderer_format, params, view_kwargs):
+    params = sorted(params.lists())
+    params.append(sorted((view_kwargs or {}).items()))
+    digest = hashlib.md5(repr(params).encode('utf-8'), usedforsecurity=False).hexdigest()
+    return ':'.join(['response', str(user_id), version, scope, renderer_format or '', digest])
+
+
+def response_cache_key(request, scope, view_kwargs=None):
+    renderer = getattr(request, 'accepted_renderer', None)
+    return _response_cache_key(
+        request.user.pk,
+        get_data_version(request.user.pk),
+        scope,
+        getattr(renderer, 'format', ''),
+        request.query_params,
+        view_kwargs,
+    )
+
+
+async def aresponse_cache_key(request, scope, view_kwargs=None):
+    """Cache key for a plain Django (async) request, which has no renderer."""
+    return _response_cache_key(
+        request.user.pk,
+        await aget_data_version(request.user.pk),
+        scope,
+        '',
+        request.GET,
+        view_kwargs,
+    )
+
+
+def cache_user_response(scope):
+    """
+    Cache the data of successful responses of a view method per user, URL
+    kwargs and query string until the user's data version changes.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return method(self, request, *args, **kwargs)
+
+            cache = response_cache()
+            key = response_cache_key(request, scope, kwargs)
+            data = cache.get(key)
+            if data is not None:
+                stats.record('hits')
+                return Response(data)
+
+            stats.record('misses')
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200 and getattr(response, 'data', None) is not None:
+                cache.set(key, response.data)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,133 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import data_version_time, get_data_version
+from .models import Event, EventTombstone
+
+
+def _per_user(queryset, aggregate):
+    return Subquery(
+        queryset.filter(user=OuterRef('pk')).order_by().values('user')
+        .annotate(value=aggregate).values('value')[:1]
+    )
+
+
+def user_data_fingerprint(user):
+    """
+    Summarize the state of a user's events with one query of indexed
+    subqueries: the number of events and the latest change, where deletions
+    count as changes through their tombstones.
+    """
+    fingerprint = User.objects.filter(pk=user.pk).values(
+        count=_per_user(Event.objects, Count('id')),
+        last_updated=_per_user(Event.objects, Max('updated_at')),
+        last_deleted=_per_user(EventTombstone.objects, Max('deleted_at')),
+    ).first() or {}
+    changes = [
+        value for value in (fingerprint.get('last_updated'), fingerprint.get('last_deleted'))
+        if value is not None
+    ]
+    return {
+        'count': fingerprint.get('count') or 0,
+        'last_modified': max(changes) if changes else None,
+    }
+
+
+def compute_etag(request, scope, fingerprint, data_version, view_kwargs=None):
+    renderer = getattr(request, 'accepted_renderer', None)
+    last_modified = fingerprint['last_modified']
+    parts = [
+        scope,
+        str(request.user.pk),
+        str(fingerprint['count']),
+        last_modified.isoformat() if last_modified else '',
+        data_version,
+        getattr(renderer, 'format', '') or '',
+        repr(sorted((view_kwargs or {}).items())),
+        repr(sorted(request.query_params.lists())),
+    ]
+    digest = hashlib.sha1('|'.join(parts).encode('utf-8'), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def last_modified_seconds(fingerprint, data_version):
+    """
+    Whole-second time of the latest change to a user's data, or None when it
+    cannot serve as ``Last-Modified``.
+
+    Event writes and deletions come from the fingerprint; every other write
+    (tags, profile, account) shows through the issue time of the data version,
+    which is reissued after each commit. A change in the current second is
+    withheld because HTTP dates cannot tell it apart from a later write in the
+    same second.
+    """
+    issued = data_version_time(data_version)
+    if issued is None:
+        return None
+    changed = fingerprint['last_modified']
+    seconds = int(max(issued, changed.timestamp()) if changed else issued)
+    return seconds if seconds < int(time.time()) else None
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+        # "*" only matches once the view has found the resource.
+        return etag in parse_etags(if_none_match)
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+    if if_modified_since is not None and last_modified is not None:
+        return last_modified <= if_modified_since
+    return False
+
+
+def _matches_any(request):
+    return parse_etags(request.headers.get('If-None-Match') or '') == ['*']
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie', 'Authorization'))
+    return response
+
+
+def conditional_user_response(scope):
+    """
+    Answer GET requests on a view method with 304 Not Modified when the
+    client's validators still match, checked before the view builds its
+    queryset. Successful responses carry ``ETag`` and ``Last-Modified``.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated:
+                return method(self, request, *args, **kwargs)
+
+            fingerprint = user_data_fingerprint(request.user)
+            data_version = get_data_version(request.user.pk)
+            etag = compute_etag(request, scope, fingerprint, data_version, kwargs)
+            last_modified = last_modified_seconds(fingerprint, data_version)
+            if _not_modified(request, etag, last_modified):
+                return _set_validators(
+                    Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified
+                )
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            if _matches_any(request):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            return _set_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,96 @@
+import csv
+import json
+import zlib
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FIELDS = (
+    'id', 'week_index', 'day_of_week', 'title', 'description',
+    'icon', 'color', 'tags', 'created_at', 'updated_at',
+)
+# Streamed output is grouped into blocks of about this many bytes.
+EXPORT_BLOCK_SIZE = 64 * 1024
+# Tag names are joined with this separator in the CSV ``tags`` column.
+CSV_TAG_SEPARATOR = ';'
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+
+class Echo:
+    """File-like object that hands back whatever the csv writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one plain dict per event. Rows are fetched ``chunk_size`` at a time
+    and tags are prefetched per chunk, so memory does not grow with history.
+    """
+    events = queryset.with_tags().order_by('week_index', 'day_of_week', 'id')
+    for event in events.iterator(chunk_size=chunk_size):
+        yield {
+            'id': event.pk,
+            'week_index': event.week_index,
+            'day_of_week': event.day_of_week,
+            'title': event.title,
+            'description': event.description,
+            'icon': event.icon,
+            'color': event.color,
+            'tags': [tag.name for tag in event.tags.all()],
+            'created_at': event.created_at.isoformat(),
+            'updated_at': event.updated_at.isoformat(),
+        }
+
+
+def iter_ndjson(rows):
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        yield (encoder.encode(row) + '\n').encode('utf-8')
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS).encode('utf-8')
+    for row in rows:
+        row['tags'] = CSV_TAG_SEPARATOR.join(row['tags'])
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS]).encode('utf-8')
+
+
+def iter_blocks(chunks, block_size=EXPORT_BLOCK_SIZE):
+    """Group small byte chunks into blocks of roughly ``block_size`` bytes."""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= block_size:
+            yield b''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+def iter_gzip(chunks):
+    """Gzip a byte stream on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_events(queryset, file_format='ndjson', compress=False):
+    """Return ``(chunks, content_type, filename)`` for a streaming export."""
+    content_type, extension = EXPORT_FORMATS[file_format]
+    rows = iter_export_rows(queryset)
+    chunks = iter_ndjson(rows) if file_format == 'ndjson' else iter_csv(rows)
+    filename = f'events.{extension}'
+    if compress:
+        return iter_blocks(iter_gzip(chunks)), 'application/gzip', filename + '.gz'
+    return iter_blocks(chunks), content_type, filename
@@ -0,0 +1,121 @@
+"""
+Sparse fieldsets: ``?fields=`` keeps only the listed fields of a response
+and ``?omit=`` drops fields from it. Names are comma separated; dotted
+names reach into nested serializers, e.g. ``fields=id,tags.name`` or
+``omit=user.profile``. Unknown names are ignored.
+
+Views use the same selection to load less: ``defer_unselected`` defers the
+columns behind dropped fields, and views skip the joins and prefetches of
+dropped nested fields.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_field_paths(value):
+    """``'id,user.username'`` -> ``{'id': {}, 'user': {'username': {}}}``."""
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+class FieldSelection:
+    """
+    The fields kept at one level of a response. ``fields`` is ``None`` when
+    every field is kept; an empty subtree keeps or omits a field whole.
+    """
+
+    def __init__(self, fields=None, omit=None):
+        self.fields = fields or None
+        self.omit = omit or {}
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None:
+            return cls()
+        params = request.query_params if hasattr(request, 'query_params') else request.GET
+        fields, omit = params.get(FIELDS_PARAM), params.get(OMIT_PARAM)
+        return cls(
+            parse_field_paths(fields) if fields else None,
+            parse_field_paths(omit) if omit else None,
+        )
+
+    def __bool__(self):
+        return self.fields is not None or bool(self.omit)
+
+    def includes(self, name):
+        if self.fields is not None and name not in self.fields:
+            return False
+        return self.omit.get(name) != {}
+
+    def with_field(self, name):
+        """A copy that also keeps the field ``name`` whole."""
+        fields = None if self.fields is None else {**self.fields, name: {}}
+        omit = {key: value for key, value in self.omit.items() if key != name}
+        return FieldSelection(fields, omit)
+
+    def nested(self, name):
+        """The selection applying inside the nested field ``name``."""
+        return FieldSelection(
+            self.fields.get(name) if self.fields is not None else None,
+            self.omit.get(name),
+        )
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin applying a ``FieldSelection``. The outermost serializer
+    reads it from ``context['request']`` and hands each nested serializer
+    its part.
+    """
+
+    @property
+    def field_selection(self):
+        selection = getattr(self, '_field_selection', None)
+        if selection is None:
+            parent = self.parent
+            if isinstance(parent, serializers.ListSerializer):
+                parent = parent.parent
+            request = self.context.get('request') if parent is None else None
+            selection = self._field_selection = FieldSelection.from_request(request)
+        return selection
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.field_selection
+        if not selection:
+            return fields
+        fields = {name: field for name, field in fields.items() if selection.includes(name)}
+        for name, field in fields.items():
+            nested = getattr(field, 'child', field)
+            if isinstance(nested, SparseFieldsMixin):
+                nested._field_selection = selection.nested(name)
+        return fields
+
+
+def deferrable_columns(model, names):
+    """The names that are plain (non-key, non-relation) columns of ``model``."""
+    columns = []
+    for name in names:
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.concrete and not field.is_relation and not field.primary_key:
+            columns.append(name)
+    return columns
+
+
+def defer_unselected(queryset, serializer_class, selection):
+    """Defer the columns behind the serializer fields ``selection`` drops."""
+    if not selection:
+        return queryset
+    dropped = [name for name in serializer_class.Meta.fields if not selection.includes(name)]
+    columns = deferrable_columns(queryset.model, dropped)
+    return queryset.defer(*columns) if columns else queryset
@@ -0,0 +1,138 @@
+import struct
+import sys
+from array import array
+
+from django.db.models import Count
+
+from .models import MAX_WEEK_INDEX
+
+GRID_WEEKS = MAX_WEEK_INDEX + 1
+GRID_MAGIC = b'LCG1'
+
+# magic, number of weeks, number of colors, number of icons
+GRID_HEADER = struct.Struct('<4sHHH')
+
+
+def grid_rows(queryset):
+    """The single GROUP BY query a grid summary is built from."""
+    return (
+        queryset.order_by()
+        .values_list('week_index', 'day_of_week', 'color', 'icon')
+        .annotate(total=Count('id'))
+    )
+
+
+def build_grid_summary(queryset):
+    """
+    Summarize a user's events as dense per-week columns.
+
+    A single GROUP BY query is folded into arrays indexed by week:
+    ``counts`` (events in the week), ``day_masks`` (bit ``n`` set when an
+    event falls on day ``n``) and ``colors``/``icons``, which hold an index
+    into the ``color_palette``/``icon_palette`` lists for the week's
+    dominant color and icon. Index 0 of each palette is reserved for
+    "no events".
+    """
+    return summarize_grid_rows(grid_rows(queryset))
+
+
+async def abuild_grid_summary(queryset):
+    """
+    Async variant of ``build_grid_summary``. The grouped rows are fetched in
+    one go: ``aiterator()`` runs reordered ``values_list()`` queries eagerly
+    on the event loop.
+    """
+    return summarize_grid_rows([row async for row in grid_rows(queryset)])
+
+
+def summarize_grid_rows(rows):
+    counts = array('H', bytes(2 * GRID_WEEKS))
+    day_masks = array('B', bytes(GRID_WEEKS))
+    colors = array('H', bytes(2 * GRID_WEEKS))
+    icons = array('H', bytes(2 * GRID_WEEKS))
+    color_palette = [None]
+    icon_palette = [None]
+    color_ids = {}
+    icon_ids = {}
+
+    # week -> value -> (total, earliest day); the earliest day breaks ties so
+    # the dominant value matches the first event the grid would show.
+    color_votes = {}
+    icon_votes = {}
+
+    for week, day, color, icon, total in rows:
+        if not 0 <= week < GRID_WEEKS:
+            continue
+        counts[week] = min(counts[week] + total, 0xFFFF)
+        day_masks[week] |= 1 << day
+        _vote(color_votes.setdefault(week, {}), color, day, total)
+        _vote(icon_votes.setdefault(week, {}), icon, day, total)
+
+    for week, votes in color_votes.items():
+        color = _dominant(votes)
+        if color not in color_ids:
+            color_ids[color] = len(color_palette)
+            color_palette.append(color)
+        colors[week] = color_ids[color]
+
+    for week, votes in icon_votes.items():
+        icon = _dominant(votes)
+        if icon not in icon_ids:
+            icon_ids[icon] = len(icon_palette)
+            icon_palette.append(icon)
+        icons[week] = icon_ids[icon]
+
+    return {
+        'weeks': GRID_WEEKS,
+        'counts': counts,
+        'day_masks': day_masks,
+        'colors': colors,
+        'icons': icons,
+        'color_palette': color_palette,
+        'icon_palette': icon_palette,
+    }
+
+
+def _vote(votes, value, day, total):
+    seen, first_day = votes.get(value, (0, day))
+    votes[value] = (seen + total, min(first_day, day))
+
+
+def _dominant(votes):
+    return max(votes, key=lambda value: (votes[value][0], -votes[value][1]))
+
+
+def grid_summary_to_json(summary):
+    """Convert the arrays of a grid summary into JSON-friendly lists."""
+    return {
+        key: value.tolist() if isinstance(value, array) else value
+        for key, value in summary.items()
+    }
+
+
+def pack_grid_summary(summary):
+    """
+    Encode a grid summary as a compact little-endian binary payload.
+
+    Layout: header (``GRID_HEADER``), ``counts`` as uint16, ``day_masks`` as
+    uint8, ``colors`` and ``icons`` as uint16, followed by the color and icon
+    palettes as length-prefixed UTF-8 strings. Palette entry 0 is omitted
+    since it is always "no events".
+    """
+    color_palette = summary['color_palette'][1:]
+    icon_palette = summary['icon_palette'][1:]
+    parts = [
+        GRID_HEADER.pack(
+            GRID_MAGIC, summary['weeks'], len(color_palette), len(icon_palette)
+        ),
+    ]
+    for key in ('counts', 'day_masks', 'colors', 'icons'):
+        column = array(summary[key].typecode, summary[key])
+        if sys.byteorder != 'little':
+            column.byteswap()
+        parts.append(column.tobytes())
+    for value in color_palette + icon_palette:
+        encoded = (value or '').encode('utf-8')[:255]
+        parts.append(struct.pack('<B', len(encoded)))
+        parts.append(encoded)
+    return b''.join(parts)
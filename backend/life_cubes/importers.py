@@ -0,0 +1,152 @@
+import csv
+import json
+import time
+
+from rest_framework import serializers
+
+from .bulk import bulk_create_events
+from .export import CSV_TAG_SEPARATOR
+from .serializers import EventSerializer
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ('ndjson', 'csv')
+# Row errors beyond this many are counted but not listed in the report.
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    """Running totals, per-batch throughput and row errors of an import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.batches = []
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def add_batch(self, rows, created, seconds):
+        self.batches.append({
+            'rows': rows,
+            'created': created,
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(rows / seconds, 1) if seconds else None,
+        })
+
+    def as_dict(self):
+        seconds = time.perf_counter() - self.started
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'failed': self.failed,
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(self.rows / seconds, 1) if seconds else None,
+            'batches': self.batches,
+            'errors': self.errors,
+        }
+
+
+def iter_ndjson_rows(stream):
+    """Yield ``(line, row)`` pairs; unparsable lines yield the error message as row."""
+    for line, raw in enumerate(stream, start=1):
+        if isinstance(raw, bytes):
+            try:
+                raw = raw.decode('utf-8')
+            except UnicodeDecodeError as exc:
+                yield line, f'Invalid UTF-8: {exc}'
+                continue
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as exc:
+            yield line, f'Invalid JSON: {exc}'
+            continue
+        if isinstance(row, dict) and isinstance(row.get('tags'), list):
+            row['tags'] = [
+                tag if isinstance(tag, dict) else {'name': tag} for tag in row['tags']
+            ]
+        yield line, row
+
+
+def _decode_lines(stream, bad_lines):
+    """Decode byte lines as UTF-8, noting undecodable ones and blanking them."""
+    for line, raw in enumerate(stream, start=1):
+        if isinstance(raw, bytes):
+            try:
+                raw = raw.decode('utf-8')
+            except UnicodeDecodeError as exc:
+                bad_lines.append((line, f'Invalid UTF-8: {exc}'))
+                raw = '\n'
+        yield raw
+
+
+def iter_csv_rows(stream):
+    """
+    Yield ``(line, row)`` pairs from CSV with a header row; undecodable and
+    malformed lines yield the error message as row.
+    """
+    bad_lines = []
+    reader = csv.DictReader(_decode_lines(stream, bad_lines))
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as exc:
+            row = f'Invalid CSV: {exc}'
+        yield from bad_lines
+        bad_lines.clear()
+        if isinstance(row, str):
+            # DictReader only updates its own line_num after a parsed row.
+            yield reader.reader.line_num, row
+            continue
+        tags = row.pop('tags', None) or ''
+        row['tags'] = [{'name': name} for name in tags.split(CSV_TAG_SEPARATOR) if name]
+        if not row.get('color'):
+            row['color'] = None
+        yield reader.line_num, row
+    yield from bad_lines
+
+
+def _flush(user, batch, report):
+    started = time.perf_counter()
+    created = len(bulk_create_events(user, batch))
+    report.created += created
+    report.add_batch(len(batch), created, time.perf_counter() - started)
+
+
+def import_events(user, stream, file_format='ndjson', batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import events for ``user`` from an NDJSON or CSV byte stream.
+
+    Rows are parsed incrementally and validated with ``EventSerializer``;
+    valid rows are committed ``batch_size`` at a time through
+    ``bulk_create_events``. Invalid rows are reported without aborting the
+    import, so memory stays bounded by the batch size.
+    """
+    rows = iter_ndjson_rows(stream) if file_format == 'ndjson' else iter_csv_rows(stream)
+    validator = EventSerializer()
+    report = ImportReport()
+    batch = []
+    for line, row in rows:
+        report.rows += 1
+        if not isinstance(row, dict):
+            report.add_error(line, row if isinstance(row, str) else 'Expected an object')
+            continue
+        try:
+            batch.append(validator.run_validation(row))
+        except serializers.ValidationError as exc:
+            report.add_error(line, exc.detail)
+            continue
+        if len(batch) >= batch_size:
+            _flush(user, batch, report)
+            batch = []
+    if batch:
+        _flush(user, batch, report)
+    return report
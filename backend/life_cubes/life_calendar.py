@@ -0,0 +1,110 @@
+"""
+Conversions between life-grid week indices and calendar dates.
+
+Each year of life starts on a birthday and holds ``WEEKS_PER_YEAR`` weeks of
+seven days; the last week of a year absorbs the one or two days left before
+the next birthday. Week ``w`` thus falls in year ``w // WEEKS_PER_YEAR``.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+
+from .models import WEEKS_PER_YEAR, MAX_WEEK_INDEX
+
+# Years touched by the grid; the final week index opens one more year.
+YEARS = MAX_WEEK_INDEX // WEEKS_PER_YEAR + 1
+YEARS_PER_DECADE = 10
+
+
+def anniversary(birth_date, years):
+    """The ``years``-th birthday; 29 February falls back to 28 February."""
+    try:
+        return birth_date.replace(year=birth_date.year + years)
+    except ValueError:
+        return birth_date.replace(year=birth_date.year + years, day=28)
+
+
+@lru_cache(maxsize=256)
+def week_starts(birth_date):
+    """
+    Start of every week as a date ordinal, followed by a sentinel for the
+    day after the grid ends. Memoized per birth date (about 33KB each).
+    """
+    starts = array('l')
+    for week in range(MAX_WEEK_INDEX + 2):
+        year, week_in_year = divmod(week, WEEKS_PER_YEAR)
+        if week_in_year == 0:
+            first_day = anniversary(birth_date, year).toordinal()
+        starts.append(first_day + 7 * week_in_year)
+    return starts
+
+
+def week_start(birth_date, week):
+    return date.fromordinal(week_starts(birth_date)[week])
+
+
+def week_end(birth_date, week):
+    """Last day of ``week`` (inclusive)."""
+    if week % WEEKS_PER_YEAR == WEEKS_PER_YEAR - 1:
+        # The last week of a year runs up to the next birthday.
+        return anniversary(birth_date, week // WEEKS_PER_YEAR + 1) - timedelta(days=1)
+    return date.fromordinal(week_starts(birth_date)[week + 1] - 1)
+
+
+def weeks_to_dates(birth_date, weeks):
+    """Map week indices to ``(start, end)`` date pairs."""
+    return [(week_start(birth_date, week), week_end(birth_date, week)) for week in weeks]
+
+
+def date_to_week(birth_date, day):
+    """Week index containing ``day``, or ``None`` outside the grid."""
+    starts = week_starts(birth_date)
+    ordinal = day.toordinal()
+    if ordinal < starts[0] or ordinal >= starts[-1]:
+        return None
+    return bisect_right(starts, ordinal) - 1
+
+
+def dates_to_weeks(birth_date, days):
+    return [date_to_week(birth_date, day) for day in days]
+
+
+def date_range_to_week_range(birth_date, start=None, end=None):
+    """
+    Translate an inclusive date range into an inclusive ``week_index`` range
+    clipped to the grid, or ``None`` when the ranges do not overlap.
+    """
+    starts = week_starts(birth_date)
+    first = starts[0] if start is None else max(start.toordinal(), starts[0])
+    last = starts[-1] - 1 if end is None else min(end.toordinal(), starts[-1] - 1)
+    if first > last:
+        return None
+    return bisect_right(starts, first) - 1, bisect_right(starts, last) - 1
+
+
+def calendar_summary(birth_date, today=None):
+    """Year and decade boundaries of the grid plus the current week."""
+    today = today or date.today()
+    return {
+        'birth_date': birth_date.isoformat(),
+        'weeks_per_year': WEEKS_PER_YEAR,
+        'total_weeks': MAX_WEEK_INDEX + 1,
+        'current_week': date_to_week(birth_date, today),
+        'years': [
+            {
+                'year': year,
+                'start_week': year * WEEKS_PER_YEAR,
+                'start_date': anniversary(birth_date, year).isoformat(),
+            }
+            for year in range(YEARS)
+        ],
+        'decades': [
+            {
+                'decade': decade,
+                'start_week': decade * YEARS_PER_DECADE * WEEKS_PER_YEAR,
+                'start_date': anniversary(birth_date, decade * YEARS_PER_DECADE).isoformat(),
+            }
+            for decade in range(-(-YEARS // YEARS_PER_DECADE))
+        ],
+    }
@@ -0,0 +1,284 @@
+"""
+HTTP load-test harness.
+
+Worker threads log in as synthetic users (see ``synthetic.py``) and drive
+a weighted mix of authenticated requests against a running server, or
+against one started in-process. Latencies are collected per endpoint and
+reported as throughput and p50/p95/p99 so runs can be saved as JSON and
+compared over time.
+"""
+import http.client
+import json
+import platform
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+
+from .models import MAX_WEEK_INDEX
+
+# name -> weight; the default traffic mix, skewed toward reads.
+DEFAULT_MIX = {
+    'events': 30,
+    'week_range': 30,
+    'dashboard': 20,
+    'grid': 10,
+    'login': 10,
+}
+PERCENTILES = (50, 95, 99)
+WEEK_RANGE_SPAN = 52
+
+
+def endpoint_request(name, rng, credentials):
+    """``(method, path, body)`` for one request to endpoint ``name``."""
+    if name == 'events':
+        return 'GET', '/api/v1/events/', None
+    if name == 'week_range':
+        start = rng.randint(0, MAX_WEEK_INDEX - WEEK_RANGE_SPAN)
+        query = f'start_week={start}&end_week={start + WEEK_RANGE_SPAN}'
+        return 'GET', f'/api/v1/events/week_range/?{query}', None
+    if name == 'dashboard':
+        return 'GET', '/api/v1/dashboard/', None
+    if name == 'grid':
+        return 'GET', '/api/v1/events/grid/', None
+    if name == 'login':
+        return 'POST', '/api/v1/auth/login/', credentials
+    raise ValueError(f'Unknown endpoint: {name}')
+
+
+def parse_mix(value):
+    """Parse ``events=30,login=10`` into a mix dict."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(
+                f"Unknown endpoint '{name}', expected one of {', '.join(DEFAULT_MIX)}"
+            )
+        mix[name] = int(weight) if weight else 1
+    if not any(mix.values()):
+        raise ValueError('The mix needs at least one endpoint with a positive weight')
+    return mix
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Client:
+    """Keep-alive HTTP client that reconnects once on a dropped connection."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        if parts.scheme == 'https':
+            connection_class = http.client.HTTPSConnection
+        else:
+            connection_class = http.client.HTTPConnection
+        self.connect = lambda: connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.conn = self.connect()
+        self.token = None
+
+    def request(self, method, path, body=None):
+        headers = {'Accept': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        for attempt in (1, 2):
+            try:
+                self.conn.request(method, path, body, headers)
+                response = self.conn.getresponse()
+                return response.status, response.read()
+            except (ConnectionError, http.client.HTTPException):
+                self.conn.close()
+                self.conn = self.connect()
+                if attempt == 2:
+                    raise
+
+    def login(self, credentials):
+        status, body = self.request('POST', '/api/v1/auth/login/', credentials)
+        if status != 200:
+            raise RuntimeError(f"Login failed for {credentials['username']}: HTTP {status}")
+        self.token = json.loads(body)['access']
+
+    def close(self):
+        self.conn.close()
+
+
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}  # endpoint -> [seconds]
+        self.errors = {}  # endpoint -> count
+        self.failures = []  # workers that could not log in
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def record_failure(self, message):
+        with self._lock:
+            self.failures.append(message)
+
+    def summary(self, duration):
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'errors': self.errors.get(endpoint, 0),
+                'throughput': round(len(latencies) / duration, 2),
+                **{f'p{p}_ms': round(percentile(latencies, p) * 1000, 2) for p in PERCENTILES},
+                'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+                'max_ms': round(latencies[-1] * 1000, 2),
+            }
+        requests = sum(values['requests'] for values in endpoints.values())
+        return {
+            'requests': requests,
+            'errors': sum(self.errors.values()),
+            'throughput': round(requests / duration, 2),
+            'endpoints': endpoints,
+            'worker_failures': self.failures,
+        }
+
+
+def worker(base_url, credentials, mix, seed, warmup_until, stop_at, results):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    client = Client(base_url)
+    try:
+        try:
+            client.login(credentials)
+        except (OSError, RuntimeError) as exc:
+            results.record_failure(str(exc))
+            return
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            method, path, body = endpoint_request(name, rng, credentials)
+            started = time.perf_counter()
+            try:
+                status, _ = client.request(method, path, body)
+                ok = status < 400
+            except OSError:
+                ok = False
+            if started >= warmup_until:
+                results.record(name, time.perf_counter() - started, ok)
+    finally:
+        client.close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    """Serve the project's WSGI app on a free local port; returns ``(server, url)``."""
+    server = ThreadedWSGIServer(
+        ('127.0.0.1', _free_port()), QuietRequestHandler, allow_reuse_address=True
+    )
+    server.set_app(get_wsgi_application())
+    # Let the threads of in-flight requests finish on their own at shutdown.
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'database': connection.vendor,
+        'debug': settings.DEBUG,
+    }
+
+
+def run_load_test(users, url=None, duration=30, warmup=5, concurrency=8, mix=None, seed=0):
+    """
+    Drive ``concurrency`` workers for ``warmup + duration`` seconds, cycling
+    through ``users`` (a list of login credential dicts), and return the
+    report. Requests made during the warm-up are not recorded.
+    """
+    if not users:
+        raise ValueError('No users to log in as; run seed_synthetic first')
+    mix = mix or DEFAULT_MIX
+    server = None
+    if url is None:
+        server, url = start_server()
+
+    results = Results()
+    started_at = datetime.now(timezone.utc)
+    warmup_until = time.perf_counter() + warmup
+    stop_at = warmup_until + duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(
+                url, users[number % len(users)], mix, seed + number,
+                warmup_until, stop_at, results,
+            ),
+        )
+        for number in range(concurrency)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    return {
+        'started_at': started_at.isoformat(),
+        'url': url,
+        'config': {
+            'duration': duration,
+            'warmup': warmup,
+            'concurrency': concurrency,
+            'users': len(users),
+            'mix': mix,
+            'seed': seed,
+        },
+        'environment': environment(),
+        **results.summary(duration),
+    }
+
+
+def compare(report, baseline):
+    """Per-endpoint relative change of throughput and percentiles against ``baseline``."""
+    deltas = {}
+    for endpoint, values in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(endpoint)
+        if not previous:
+            continue
+        deltas[endpoint] = {
+            key: round((values[key] - previous[key]) / previous[key] * 100, 1)
+            for key in ('throughput', *(f'p{p}_ms' for p in PERCENTILES))
+            if previous.get(key)
+        }
+    return deltas
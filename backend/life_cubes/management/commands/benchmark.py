@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from life_cubes.benchmarks import (
+    BENCHMARKS, DEFAULT_TOLERANCE, ROUND_SECONDS, ROUNDS, find_regressions, run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run the microbenchmarks against a throwaway in-memory SQLite database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Benchmarks to run: {', '.join(BENCHMARKS)}")
+        parser.add_argument('--round-seconds', type=float, default=ROUND_SECONDS)
+        parser.add_argument('--rounds', type=int, default=ROUNDS)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the results as JSON')
+        parser.add_argument('--baseline', help='Compare against results saved earlier')
+        parser.add_argument('--save-baseline', help='Write the results as the new baseline file')
+        parser.add_argument(
+            '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+            help='Relative slowdown or allocation growth flagged as a regression',
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error when a regression is found',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Benchmarks run on in-memory SQLite; set DB_ENGINE=sqlite')
+        unknown = set(options['names']) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        # The test database of the SQLite profiles is in memory.
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = run_benchmarks(
+                options['names'],
+                round_seconds=options['round_seconds'],
+                rounds=options['rounds'],
+                seed=options['seed'],
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        regressions = {}
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                regressions = find_regressions(results, json.load(f), options['tolerance'])
+
+        self.stdout.write(
+            f"{'benchmark':<26} {'ops/sec':>12} {'mean us':>12} "
+            f"{'peak KiB':>10} {'retained KiB':>13}"
+        )
+        for name, values in results.items():
+            line = (
+                f"{name:<26} {values['ops_per_sec']:>12} {values['mean_us']:>12} "
+                f"{values['peak_bytes'] / 1024:>10.1f} {values['retained_bytes'] / 1024:>13.1f}"
+            )
+            if name in regressions:
+                line = self.style.ERROR(f"{line}  REGRESSION: {'; '.join(regressions[name])}")
+            self.stdout.write(line)
+
+        for path in (options['output'], options['save_baseline']):
+            if path:
+                with open(path, 'w') as f:
+                    json.dump(results, f, indent=2, sort_keys=True)
+                self.stdout.write(f'Results written to {path}')
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} benchmark(s) regressed')
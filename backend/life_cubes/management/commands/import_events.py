@@ -0,0 +1,42 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from life_cubes.importers import IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_events
+
+
+class Command(BaseCommand):
+    help = "Import a user's events from an NDJSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS, dest='file_format',
+            help='File format (default: guessed from the file extension)',
+        )
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist")
+
+        path = options['path']
+        file_format = options['file_format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        with open(path, 'rb') as stream:
+            report = import_events(user, stream, file_format, options['batch_size']).as_dict()
+
+        for number, batch in enumerate(report['batches'], start=1):
+            self.stdout.write(
+                f"batch {number}: {batch['created']} events in {batch['seconds']}s "
+                f"({batch['rows_per_second']} rows/s)"
+            )
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} of {report['rows']} rows "
+            f"({report['failed']} failed) in {report['seconds']}s"
+        ))
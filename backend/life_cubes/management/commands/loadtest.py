@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from life_cubes.loadtest import PERCENTILES, compare, parse_mix, run_load_test
+from life_cubes.synthetic import SYNTHETIC_PASSWORD, SYNTHETIC_PREFIX
+
+
+class Command(BaseCommand):
+    help = 'Drive concurrent authenticated traffic at the API and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Base URL of a running server; by default one is started in-process',
+        )
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+        parser.add_argument(
+            '--warmup', type=float, default=5, help='Unmeasured seconds before measuring'
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--mix', help='Endpoint weights, e.g. events=30,week_range=30,login=10')
+        parser.add_argument(
+            '--prefix', default=SYNTHETIC_PREFIX,
+            help='Username prefix of the users to log in as',
+        )
+        parser.add_argument('--password', default=SYNTHETIC_PASSWORD)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Report path (default: loadtest-<timestamp>.json)')
+        parser.add_argument('--baseline', help='Earlier report to compare against')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix']) if options['mix'] else None
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        usernames = User.objects.filter(
+            username__startswith=options['prefix']
+        ).order_by('id').values_list('username', flat=True)
+        users = [{'username': name, 'password': options['password']} for name in usernames]
+        if not users:
+            raise CommandError(f"No users named {options['prefix']}*; run seed_synthetic first")
+
+        report = run_load_test(
+            users,
+            url=options['url'],
+            duration=options['duration'],
+            warmup=options['warmup'],
+            concurrency=options['concurrency'],
+            mix=mix,
+            seed=options['seed'],
+        )
+
+        header = f"{'endpoint':<12} {'requests':>8} {'errors':>6} {'req/s':>8}"
+        header += ''.join(f" {f'p{p} ms':>9}" for p in PERCENTILES)
+        self.stdout.write(header)
+        for endpoint, values in report['endpoints'].items():
+            line = (
+                f"{endpoint:<12} {values['requests']:>8} {values['errors']:>6} "
+                f"{values['throughput']:>8}"
+            )
+            line += ''.join(f" {values[f'p{p}_ms']:>9}" for p in PERCENTILES)
+            self.stdout.write(line)
+        self.stdout.write(f"Total: {report['requests']} requests, {report['errors']} errors, "
+                          f"{report['throughput']} req/s")
+
+        for failure in report['worker_failures']:
+            self.stderr.write(f'Worker failed: {failure}')
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                deltas = compare(report, json.load(f))
+            report['baseline'] = {'path': options['baseline'], 'change_percent': deltas}
+            for endpoint, changes in deltas.items():
+                self.stdout.write(f'{endpoint}: ' + ', '.join(
+                    f'{key} {change:+.1f}%' for key, change in changes.items()
+                ))
+
+        output = options['output'] or f"loadtest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Report written to {output}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from life_cubes.tokens import PRUNE_BATCH_SIZE, prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted JWT refresh tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PRUNE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted['outstanding']} outstanding and "
+            f"{deleted['blacklisted']} blacklisted tokens"
+        ))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from life_cubes.sync import TOMBSTONE_PRUNE_BATCH_SIZE, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete event tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=TOMBSTONE_PRUNE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} tombstones older than '
+            f'{settings.SYNC_TOMBSTONE_RETENTION_DAYS} days'
+        ))
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from life_cubes.stats import refresh_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard statistics of all (or the given) users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        refreshed = 0
+        for user_id in users.values_list('pk', flat=True).iterator():
+            refresh_user_stats(user_id)
+            refreshed += 1
+        self.stdout.write(self.style.SUCCESS(f'Refreshed stats of {refreshed} users'))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from life_cubes.synthetic import (
+    SYNTHETIC_PASSWORD, SYNTHETIC_PREFIX, clear_synthetic_users, seed_synthetic,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create reproducible synthetic users, tags and events for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--events-per-user', type=int, default=500,
+            help='Mean number of events per user; actual counts are skewed around it',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default=SYNTHETIC_PREFIX, help='Username prefix')
+        parser.add_argument('--password', default=SYNTHETIC_PASSWORD)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete existing users with the prefix first',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = clear_synthetic_users(options['prefix'])
+            self.stdout.write(f'Deleted {deleted} synthetic users')
+
+        started = time.perf_counter()
+        users, events = seed_synthetic(
+            options['users'],
+            options['events_per_user'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            password=options['password'],
+        )
+        seconds = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {users} users and {events} events in {seconds:.1f}s '
+            f"(password {options['password']!r})"
+        ))
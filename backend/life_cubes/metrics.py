@@ -0,0 +1,324 @@
+"""
+Per-request performance metrics.
+
+``MetricsMiddleware`` times every request and, through an execute wrapper
+installed on each database connection, counts and times its queries.
+Phases such as serialization are timed with ``timed()``. Results are
+aggregated per view into histograms served in the Prometheus text format by
+``metrics_view``, and each response carries a ``Server-Timing`` header.
+Requests slower than ``METRICS_SLOW_REQUEST_SECONDS`` are logged with their
+slowest queries, and a sample of them with the query plan of the slowest.
+"""
+import contextvars
+import hmac
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from ipaddress import ip_address, ip_network
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .cache import stats as cache_stats
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (help, buckets)
+HISTOGRAMS = {
+    'request_duration_seconds': ('Request latency in seconds.', LATENCY_BUCKETS),
+    'db_queries': ('Database queries per request.', QUERY_BUCKETS),
+    'db_duration_seconds': ('Time spent in database queries per request.', LATENCY_BUCKETS),
+    'serialize_duration_seconds': ('Time spent serializing per request.', LATENCY_BUCKETS),
+    'response_size_bytes': ('Response body size in bytes.', SIZE_BUCKETS),
+}
+METRIC_PREFIX = 'life_cubes_'
+# Slowest queries kept per request for the slow request log.
+SLOW_QUERIES_KEPT = 5
+
+_current = contextvars.ContextVar('life_cubes_request_metrics', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe per-view histograms and request counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}  # (name, view, method) -> Histogram
+            self._requests = {}  # (view, method, status) -> count
+
+    def observe(self, view, method, status, values):
+        """Record one request; ``values`` maps histogram names to observations."""
+        with self._lock:
+            key = (view, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, value in values.items():
+                if value is None:
+                    continue
+                series = (name, view, method)
+                histogram = self._histograms.get(series)
+                if histogram is None:
+                    histogram = self._histograms[series] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            name = METRIC_PREFIX + 'requests_total'
+            lines += [f'# HELP {name} Requests served.', f'# TYPE {name} counter']
+            for (view, method, status), count in sorted(self._requests.items()):
+                lines.append(f'{name}{_labels(view=view, method=method, status=status)} {count}')
+
+            for short_name, (help_text, buckets) in HISTOGRAMS.items():
+                name = METRIC_PREFIX + short_name
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (hist_name, view, method), histogram in sorted(self._histograms.items()):
+                    if hist_name != short_name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*buckets, '+Inf'), histogram.counts):
+                        cumulative += count
+                        labels = _labels(view=view, method=method, le=bound)
+                        lines.append(f'{name}_bucket{labels} {cumulative}')
+                    labels = _labels(view=view, method=method)
+                    lines.append(f'{name}_sum{labels} {histogram.sum}')
+                    lines.append(f'{name}_count{labels} {histogram.count}')
+
+        for counter, value in cache_stats.as_dict().items():
+            name = f'{METRIC_PREFIX}response_cache_{counter}_total'
+            lines += [f'# TYPE {name} counter', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetrics:
+    """Query counts, timings and slowest queries of a single request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+        self.slow_queries = []  # (seconds, alias, sql, params), slowest first
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_seconds += elapsed
+            if len(self.slow_queries) < SLOW_QUERIES_KEPT or elapsed > self.slow_queries[-1][0]:
+                alias = context['connection'].alias
+                self.slow_queries.append((elapsed, alias, sql, None if many else params))
+                self.slow_queries.sort(key=lambda query: query[0], reverse=True)
+                del self.slow_queries[SLOW_QUERIES_KEPT:]
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total):
+        entries = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"']
+        entries += [f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in self.phases.items()]
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(phase, time.perf_counter() - started)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    # Unresolved paths share one label so 404 probes cannot grow the registry.
+    return match.view_name if match is not None else '<unresolved>'
+
+
+def explain(alias, sql, params):
+    """Query plan of a SELECT, or ``None`` where it cannot be produced."""
+    if params is None or not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    connection = connections[alias]
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            # The plan text is the last column on both SQLite and PostgreSQL.
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except Exception:
+        logger.debug('Could not explain query', exc_info=True)
+        return None
+
+
+def log_slow_request(request, view, duration, metrics):
+    queries = '\n'.join(
+        f'  {seconds * 1000:.1f}ms {sql}' for seconds, _, sql, _ in metrics.slow_queries
+    )
+    plan = None
+    if metrics.slow_queries and random.random() < settings.METRICS_PLAN_SAMPLE_RATE:
+        _, alias, sql, params = metrics.slow_queries[0]
+        plan = explain(alias, sql, params)
+    logger.warning(
+        'Slow request %s %s (%s): %.1fms, %d queries in %.1fms\n%s%s',
+        request.method,
+        request.path,
+        view,
+        duration * 1000,
+        metrics.queries,
+        metrics.db_seconds * 1000,
+        queries,
+        f'\nPlan of the slowest query:\n{plan}' if plan else '',
+    )
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection; hands queries to the
+    metrics of the request being served, if any. Going through the context
+    variable reaches the queries of async views too, which Django runs on
+    worker threads with their own connections.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    """``connection_created`` receiver adding ``record_query`` once per connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, database work and response size of every request.
+    Works in both sync and async stacks, so async views keep running on the
+    event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - started
+        if self.record(request, response, duration, metrics):
+            log_slow_request(request, view_name(request), duration, metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - started
+        if self.record(request, response, duration, metrics):
+            await sync_to_async(log_slow_request)(request, view_name(request), duration, metrics)
+        return response
+
+    def record(self, request, response, duration, metrics):
+        """Observe the request and add ``Server-Timing``; returns whether it was slow."""
+        registry.observe(view_name(request), request.method, response.status_code, {
+            'request_duration_seconds': duration,
+            'db_queries': metrics.queries,
+            'db_duration_seconds': metrics.db_seconds,
+            'serialize_duration_seconds': metrics.phases.get('serialize'),
+            'response_size_bytes': None if response.streaming else len(response.content),
+        })
+        response['Server-Timing'] = metrics.server_timing(duration)
+        return duration >= settings.METRICS_SLOW_REQUEST_SECONDS
+
+
+def client_allowed(request):
+    """Whether the client address lies in ``METRICS_ALLOWED_NETWORKS``."""
+    try:
+        address = ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS
+    )
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. With ``METRICS_TOKEN`` set it requires that
+    bearer token; without one it only answers ``METRICS_ALLOWED_NETWORKS``.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif not client_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
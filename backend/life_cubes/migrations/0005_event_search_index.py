@@ -0,0 +1,60 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS life_cubes_event_fts USING fts5("
+    "owner, title, description, tags, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO life_cubes_event_fts (rowid, owner, title, description, tags) "
+    "SELECT event.id, 'u' || event.user_id, event.title, event.description, "
+    "COALESCE((SELECT group_concat(tag.name, ' ') FROM life_cubes_event_tags link "
+    "JOIN life_cubes_tag tag ON tag.id = link.tag_id WHERE link.event_id = event.id), '') "
+    "FROM life_cubes_event event",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS life_cubes_event_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE TABLE IF NOT EXISTS life_cubes_event_search ("
+    "event_id bigint PRIMARY KEY REFERENCES life_cubes_event (id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "user_id integer NOT NULL, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS life_cubes_event_search_document "
+    "ON life_cubes_event_search USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS life_cubes_event_search_user "
+    "ON life_cubes_event_search (user_id)",
+    "INSERT INTO life_cubes_event_search (event_id, user_id, document) "
+    "SELECT event.id, event.user_id, "
+    "setweight(to_tsvector('simple', event.title), 'A') || "
+    "setweight(to_tsvector('simple', COALESCE((SELECT string_agg(tag.name, ' ') "
+    "FROM life_cubes_event_tags link JOIN life_cubes_tag tag ON tag.id = link.tag_id "
+    "WHERE link.event_id = event.id), '')), 'B') || "
+    "setweight(to_tsvector('simple', event.description), 'C') "
+    "FROM life_cubes_event event",
+]
+POSTGRES_BACKWARD = [
+    "DROP TABLE IF EXISTS life_cubes_event_search",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("life_cubes", "0004_eventtombstone"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index the expiry of simplejwt's outstanding tokens so that pruning
+    expired tokens in batches does not scan the whole table.
+    """
+
+    dependencies = [
+        ("life_cubes", "0005_event_search_index"),
+        ("token_blacklist", "0012_alter_outstandingtoken_user"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS life_cubes_outstandingtoken_expires_at "
+            "ON token_blacklist_outstandingtoken (expires_at)",
+            "DROP INDEX IF EXISTS life_cubes_outstandingtoken_expires_at",
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("life_cubes", "0006_outstandingtoken_expires_at_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("total_events", models.PositiveIntegerField(default=0)),
+                ("total_tags", models.PositiveIntegerField(default=0)),
+                ("first_week", models.IntegerField(blank=True, null=True)),
+                ("last_week", models.IntegerField(blank=True, null=True)),
+                ("events_per_year", models.JSONField(blank=True, default=dict)),
+                ("tags", models.JSONField(blank=True, default=list)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("computed_version", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "User stats",
+            },
+        ),
+    ]
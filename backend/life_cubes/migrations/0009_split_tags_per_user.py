@@ -0,0 +1,67 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def split_tags_per_user(apps, schema_editor):
+    """
+    Give every user their own copy of each shared tag they use. The first
+    user of a tag keeps the original row; tags used by nobody are dropped.
+    """
+    Tag = apps.get_model("life_cubes", "Tag")
+    Event = apps.get_model("life_cubes", "Event")
+    EventTag = Event.tags.through
+
+    tags = Tag.objects.in_bulk()
+    pairs = (
+        EventTag.objects.values_list("tag_id", "event__user_id")
+        .distinct()
+        .order_by("tag_id", "event__user_id")
+    )
+    for tag_id, user_id in pairs:
+        tag = tags[tag_id]
+        if tag.user_id is None:
+            tag.user_id = user_id
+            tag.save(update_fields=["user"])
+            continue
+        copy = Tag.objects.create(user_id=user_id, name=tag.name)
+        Tag.objects.filter(pk=copy.pk).update(created_at=tag.created_at)
+        EventTag.objects.filter(tag_id=tag_id, event__user_id=user_id).update(tag_id=copy.pk)
+
+    Tag.objects.filter(user__isnull=True).delete()
+    links = (
+        EventTag.objects.filter(tag_id=OuterRef("pk"))
+        .order_by()
+        .values("tag_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    Tag.objects.update(usage_count=Coalesce(Subquery(links), 0))
+
+
+def merge_tags_by_name(apps, schema_editor):
+    """Fold per-user tags back into one tag per name."""
+    Tag = apps.get_model("life_cubes", "Tag")
+    Event = apps.get_model("life_cubes", "Event")
+    EventTag = Event.tags.through
+
+    kept = {}
+    for tag_id, name in Tag.objects.order_by("pk").values_list("pk", "name"):
+        if name in kept:
+            # Each event belongs to one user, so it never carries both tags.
+            EventTag.objects.filter(tag_id=tag_id).update(tag_id=kept[name])
+            Tag.objects.filter(pk=tag_id).delete()
+        else:
+            kept[name] = tag_id
+    Tag.objects.update(user=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("life_cubes", "0008_tag_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(split_tags_per_user, merge_tags_by_name),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes matching the event access paths: (user, week_index, day_of_week)
+    replaces (user, week_index) for the grid and ordered lists, (user,
+    updated_at) serves the change feed, and (tag_id, event_id) on the
+    event/tag link table answers tag filters and usage counts from the index.
+    """
+
+    dependencies = [
+        ("life_cubes", "0010_tag_user_required"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["user", "week_index", "day_of_week"],
+                name="life_cubes__user_id_11eb22_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["user", "updated_at"], name="life_cubes__user_id_fe258e_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="event",
+            name="life_cubes__user_id_be5e17_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS life_cubes_event_tags_tag_event "
+            "ON life_cubes_event_tags (tag_id, event_id)",
+            "DROP INDEX IF EXISTS life_cubes_event_tags_tag_event",
+        ),
+    ]
@@ -1,7 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+# The life grid spans 80 years of 52 weeks each.
+WEEKS_PER_YEAR = 52
+MAX_WEEK_INDEX = 80 * WEEKS_PER_YEAR
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -13,21 +19,74 @@ class UserProfile(models.Model):
         return f"{self.user.username}'s profile"
 
 
+class TagQuerySet(models.QuerySet):
+    def resolve(self, user, names):
+        """
+        Map tag names to ``user``'s tags, creating the missing ones in a
+        single batch. Concurrent writers creating the same name are tolerated.
+        """
+        names = set(names)
+        if not names:
+            return {}
+        tags = {tag.name: tag for tag in self.filter(user=user, name__in=names)}
+        missing = names - tags.keys()
+        if missing:
+            self.bulk_create(
+                [self.model(user=user, name=name) for name in missing], ignore_conflicts=True
+            )
+            tags.update((tag.name, tag) for tag in self.filter(user=user, name__in=missing))
+        return tags
+
+    def refresh_usage_counts(self):
+        """Recount the events carrying each tag with a single UPDATE."""
+        links = (
+            self.model.events.through.objects.filter(tag_id=models.OuterRef('pk'))
+            .order_by()
+            .values('tag_id')
+            .annotate(count=models.Count('*'))
+            .values('count')
+        )
+        return self.update(usage_count=Coalesce(models.Subquery(links), 0))
+
+
 class Tag(models.Model):
-    name = models.CharField(max_length=50, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tags')
+    name = models.CharField(max_length=50)
+    usage_count = models.PositiveIntegerField(default=0)  # Events carrying the tag
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TagQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            # Also the index behind tag listing and name lookups.
+            models.UniqueConstraint(fields=['user', 'name'], name='unique_tag_name_per_user'),
+        ]
+
+
+class EventQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(user=user)
+
+    def with_tags(self):
+        """Prefetch tags in one extra query instead of one per event."""
+        return self.prefetch_related(
+            models.Prefetch('tags', queryset=Tag.objects.order_by('name'))
+        )
+
+    def for_read(self):
+        """Load everything ``EventSerializer`` renders, owner profile included."""
+        return self.select_related('user', 'user__profile').with_tags()
 
 
 class Event(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='events')
     week_index = models.IntegerField(
-        validators=[MinValueValidator(0), MaxValueValidator(4160)]  # 80 years * 52 weeks
+        validators=[MinValueValidator(0), MaxValueValidator(MAX_WEEK_INDEX)]
     )
     day_of_week = models.IntegerField(
         validators=[MinValueValidator(0), MaxValueValidator(6)]
@@ -40,12 +99,77 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} (Week {self.week_index})"
 
     class Meta:
         ordering = ['week_index', 'day_of_week']
         indexes = [
-            models.Index(fields=['user', 'week_index']),
+            # Grid, week range and keyset pagination order.
+            models.Index(fields=['user', 'week_index', 'day_of_week']),
             models.Index(fields=['user', 'created_at']),
-        ] 
\ No newline at end of file
+            # Change feed and conditional request fingerprints.
+            models.Index(fields=['user', 'updated_at']),
+        ]
+
+
+class EventTombstone(models.Model):
+    """Record of a deleted event, kept so clients can sync deletions."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_tombstones')
+    event_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Deleted event {self.event_id}"
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
+
+class TombstoneWatermark(models.Model):
+    """
+    Newest pruned tombstone of a user. Sync cursors older than it may have
+    missed deletions.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='tombstone_watermark'
+    )
+    pruned_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user.username}'s tombstones pruned until {self.pruned_until}"
+
+
+class UserStats(models.Model):
+    """
+    Per-user event statistics backing the dashboard. Writes to a user's
+    events and tags increment ``version``; rows are recomputed lazily when
+    it no longer matches ``computed_version``.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    total_events = models.PositiveIntegerField(default=0)
+    total_tags = models.PositiveIntegerField(default=0)
+    first_week = models.IntegerField(null=True, blank=True)
+    last_week = models.IntegerField(null=True, blank=True)
+    events_per_year = models.JSONField(default=dict, blank=True)  # {year of life: count}
+    tags = models.JSONField(default=list, blank=True)  # [{id, name, created_at, count}]
+    version = models.PositiveBigIntegerField(default=0)
+    computed_version = models.PositiveBigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username}'s stats"
+
+    @property
+    def is_stale(self):
+        return self.computed_version != self.version
+
+    class Meta:
+        verbose_name_plural = 'User stats'
@@ -0,0 +1,97 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class EventKeysetPagination(BasePagination):
+    """
+    Opt-in keyset pagination for events in ``(week_index, day_of_week, id)``
+    order. Pages are only produced when the request carries ``cursor`` or
+    ``page_size``; otherwise the full list is returned as before.
+
+    Each page seeks past the last row of the previous one instead of using
+    OFFSET, so it stays on the ``(user, week_index)`` index however deep the
+    client pages.
+    """
+    ordering = ('week_index', 'day_of_week', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    @property
+    def page_size(self):
+        return getattr(settings, 'EVENTS_PAGE_SIZE', 500)
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'EVENTS_MAX_PAGE_SIZE', 1000)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size_used = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            week_index, day_of_week, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(week_index__gt=week_index)
+                | Q(week_index=week_index, day_of_week__gt=day_of_week)
+                | Q(week_index=week_index, day_of_week=day_of_week, id__gt=pk)
+            )
+
+        rows = list(queryset[:self.page_size_used + 1])
+        self.has_next = len(rows) > self.page_size_used
+        self.page = rows[:self.page_size_used]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, event):
+        raw = json.dumps([event.week_index, event.day_of_week, event.pk], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            week_index, day_of_week, pk = (int(value) for value in json.loads(raw))
+        except (ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        return week_index, day_of_week, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+        return replace_query_param(url, self.page_size_query_param, self.page_size_used)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
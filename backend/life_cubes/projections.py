@@ -0,0 +1,91 @@
+"""
+Serializer-free event lists for read-only endpoints.
+
+``project_events`` reads events with ``values_list()`` and their tags with
+one query on the event/tag link table, then builds the same dicts as
+``EventListSerializer`` without instantiating models or nested serializers.
+The output is identical, key order included, so it renders to the same
+bytes.
+"""
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .fieldsets import FieldSelection
+from .metrics import timed
+from .models import Event
+from .serializers import EventListSerializer, EventTagSerializer
+
+EVENT_FIELDS = EventListSerializer.Meta.fields
+TAG_FIELDS = EventTagSerializer.Meta.fields
+# Link table lookups behind each tag field.
+TAG_COLUMNS = {'id': 'tag_id', 'name': 'tag__name', 'created_at': 'tag__created_at'}
+DATETIME_FIELDS = ('created_at', 'updated_at')
+
+_datetime_field = serializers.DateTimeField()
+
+
+def datetime_formatter():
+    """
+    ``DateTimeField.to_representation`` with the output format and current
+    timezone looked up once instead of per value.
+    """
+    output_format = api_settings.DATETIME_FORMAT
+    field_timezone = _datetime_field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return lambda value: None if value is None else _datetime_field.to_representation(value)
+
+    def to_representation(value):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return _datetime_field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return to_representation
+
+
+def event_tags(queryset, to_datetime, fields=TAG_FIELDS):
+    """Map event id to its serialized tags, sorted by name, in one query."""
+    columns = [TAG_COLUMNS[field] for field in fields]
+    links = (
+        Event.tags.through.objects
+        .filter(event_id__in=queryset.values('pk'))
+        .order_by('tag__name')
+        .values_list('event_id', *columns)
+    )
+    tags = {}
+    for event_id, *row in links:
+        values = dict(zip(fields, row))
+        if 'created_at' in values:
+            values['created_at'] = to_datetime(values['created_at'])
+        tags.setdefault(event_id, []).append(values)
+    return tags
+
+
+def project_events(queryset, selection=None):
+    """
+    The ``EventListSerializer(queryset, many=True).data`` of an event
+    queryset, limited to the fields of ``selection`` (a ``FieldSelection``).
+    """
+    selection = selection or FieldSelection()
+    fields = [field for field in EVENT_FIELDS if selection.includes(field)]
+    # The id is always read, to attach the tags.
+    columns = ['id'] + [field for field in fields if field not in ('id', 'tags')]
+    datetime_fields = [field for field in DATETIME_FIELDS if field in fields]
+
+    with timed('serialize'):
+        rows = list(queryset.prefetch_related(None).values_list(*columns))
+        to_datetime = datetime_formatter()
+        tags = {}
+        if rows and 'tags' in fields:
+            tag_selection = selection.nested('tags')
+            tag_fields = [field for field in TAG_FIELDS if tag_selection.includes(field)]
+            tags = event_tags(queryset, to_datetime, tag_fields)
+        events = []
+        for row in rows:
+            values = dict(zip(columns, row))
+            for field in datetime_fields:
+                values[field] = to_datetime(values[field])
+            values['tags'] = tags.get(values['id'], [])
+            events.append({field: values[field] for field in fields})
+        return events
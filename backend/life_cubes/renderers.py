@@ -0,0 +1,107 @@
+import json
+import math
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .grid import pack_grid_summary
+
+try:
+    import orjson
+except ImportError:  # The stdlib paths of the base classes are used instead
+    orjson = None
+
+# Integer keys are stringified like json does; datetimes and dataclasses
+# go through DRF's encoder so their formatting matches JSONRenderer.
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` producing the same compact bytes with orjson when it is
+    installed. Indented output for the browsable API stays on the stdlib
+    path, and so does data with NaN or infinities, which orjson writes as
+    null where ``JSONRenderer`` raises ``ValueError`` (or writes ``NaN``
+    when not strict).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # Types orjson refuses even through ``default``, e.g. integers
+            # beyond 64 bits.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Non-finite floats come out as null, so only output with a null
+        # needs the data checked for them.
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, so the output is valid JavaScript too.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+_encoder = JSONEncoder()
+
+
+def _has_non_finite(value):
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(map(_has_non_finite, value.values()))
+    if isinstance(value, (list, tuple)):
+        return any(map(_has_non_finite, value))
+    return False
+
+
+def _default(value):
+    # Lazy translations, Decimals, querysets and the like, as DRF encodes them.
+    return _encoder.default(value)
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` decoding with orjson when it is installed."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class GridBinaryRenderer(BaseRenderer):
+    """
+    Render a grid summary with the packed binary layout from
+    ``life_cubes.grid.pack_grid_summary``. Select it with
+    ``Accept: application/octet-stream`` or ``?format=bin``.
+    """
+    media_type = 'application/octet-stream'
+    format = 'bin'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if 'counts' not in data:
+            # Errors raised after content negotiation still reach this renderer.
+            return json.dumps(data).encode('utf-8')
+        return pack_grid_summary(data)
@@ -0,0 +1,245 @@
+import re
+from functools import lru_cache
+from itertools import islice
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Event
+
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 200
+
+SQLITE_TABLE = 'life_cubes_event_fts'
+POSTGRES_TABLE = 'life_cubes_event_search'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split a user query into word tokens, dropping any search syntax."""
+    return _TOKEN_RE.findall(query.lower())[:16]
+
+
+def event_documents(event_ids):
+    """Return ``(event_id, user_id, title, description, tags)`` rows for indexing."""
+    tags = {}
+    through = Event.tags.through.objects.filter(event_id__in=event_ids)
+    for event_id, name in through.values_list('event_id', 'tag__name'):
+        tags.setdefault(event_id, []).append(name)
+    rows = Event.objects.filter(pk__in=event_ids).values_list(
+        'pk', 'user_id', 'title', 'description'
+    )
+    return [
+        (pk, user_id, title, description, ' '.join(tags.get(pk, ())))
+        for pk, user_id, title, description in rows
+    ]
+
+
+def _chunks(ids, size=500):
+    ids = iter(ids)
+    while chunk := list(islice(ids, size)):
+        yield chunk
+
+
+class SQLiteSearchBackend:
+    """
+    FTS5 index with one row per event (``rowid`` is the event id). The owner
+    is stored as an indexed ``u<id>`` token so the user filter is part of
+    the full-text match instead of a scan over the user's events; the search
+    terms are limited to the content columns so they never match it.
+    """
+
+    def index(self, event_ids):
+        for chunk in _chunks(event_ids):
+            self.remove(chunk)
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f'INSERT INTO {SQLITE_TABLE} (rowid, owner, title, description, tags) '
+                    'VALUES (%s, %s, %s, %s, %s)',
+                    [
+                        (pk, f'u{user_id}', title, description, tags)
+                        for pk, user_id, title, description, tags
+                        in event_documents(chunk)
+                    ],
+                )
+
+    def remove(self, event_ids):
+        with connection.cursor() as cursor:
+            for chunk in _chunks(event_ids):
+                placeholders = ','.join(['%s'] * len(chunk))
+                cursor.execute(
+                    f'DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({placeholders})', chunk
+                )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE}')
+
+    def _match(self, user, terms):
+        content = ' AND '.join(f'"{term}"*' for term in terms)
+        return f'owner : "u{user.pk}" AND {{title description tags}} : ({content})'
+
+    def search(self, user, query, limit):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s '
+                f'ORDER BY bm25({SQLITE_TABLE}, 0.0, 10.0, 1.0, 5.0) LIMIT %s',
+                [self._match(user, terms), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def matching(self, user, terms):
+        return RawSQL(
+            f'SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s',
+            [self._match(user, terms)],
+        )
+
+
+class PostgresSearchBackend:
+    """
+    ``tsvector`` documents in a side table with a GIN index, weighted title
+    (A), tags (B) and description (C), ranked with ``ts_rank``.
+    """
+
+    def index(self, event_ids):
+        with connection.cursor() as cursor:
+            for chunk in _chunks(event_ids):
+                cursor.executemany(
+                    f'INSERT INTO {POSTGRES_TABLE} (event_id, user_id, document) VALUES ('
+                    "%s, %s, setweight(to_tsvector('simple', %s), 'A') || "
+                    "setweight(to_tsvector('simple', %s), 'B') || "
+                    "setweight(to_tsvector('simple', %s), 'C')) "
+                    'ON CONFLICT (event_id) DO UPDATE SET '
+                    'user_id = EXCLUDED.user_id, document = EXCLUDED.document',
+                    [
+                        (pk, user_id, title, tags, description)
+                        for pk, user_id, title, description, tags
+                        in event_documents(chunk)
+                    ],
+                )
+
+    def remove(self, event_ids):
+        with connection.cursor() as cursor:
+            for chunk in _chunks(event_ids):
+                cursor.execute(f'DELETE FROM {POSTGRES_TABLE} WHERE event_id = ANY(%s)', [chunk])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {POSTGRES_TABLE}')
+
+    def _tsquery(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, user, query, limit):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT event_id FROM {POSTGRES_TABLE}, to_tsquery(%s, %s) query '
+                'WHERE user_id = %s AND document @@ query '
+                'ORDER BY ts_rank(document, query) DESC, event_id LIMIT %s',
+                ['simple', self._tsquery(terms), user.pk, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def matching(self, user, terms):
+        return RawSQL(
+            f'SELECT event_id FROM {POSTGRES_TABLE} '
+            "WHERE user_id = %s AND document @@ to_tsquery('simple', %s)",
+            [user.pk, self._tsquery(terms)],
+        )
+
+
+class FallbackSearchBackend:
+    """Unindexed substring search for databases without a full-text index."""
+
+    def index(self, event_ids):
+        pass
+
+    def remove(self, event_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def _matches(self, user, terms):
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(title__icontains=term)
+                | Q(description__icontains=term)
+                | Q(tags__name__icontains=term)
+            )
+        return Event.objects.for_user(user).filter(condition)
+
+    def search(self, user, query, limit):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        queryset = self._matches(user, terms).order_by('week_index', 'day_of_week', 'id')
+        return list(queryset.values_list('pk', flat=True).distinct()[:limit])
+
+    def matching(self, user, terms):
+        return self._matches(user, terms).values('pk')
+
+
+@lru_cache(maxsize=None)
+def backend_for_vendor(vendor):
+    if vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    if vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return FallbackSearchBackend()
+
+
+def get_search_backend():
+    return backend_for_vendor(connection.vendor)
+
+
+def index_events(event_ids):
+    if event_ids:
+        get_search_backend().index(event_ids)
+
+
+def remove_events(event_ids):
+    if event_ids:
+        get_search_backend().remove(event_ids)
+
+
+def rebuild_index(backend=None, batch_size=1000):
+    """Re-index every event; returns the number of events indexed."""
+    backend = backend or get_search_backend()
+    backend.clear()
+    indexed = 0
+    ids = Event.objects.order_by('pk').values_list('pk', flat=True)
+    for chunk in _chunks(ids.iterator(chunk_size=batch_size), batch_size):
+        backend.index(chunk)
+        indexed += len(chunk)
+    return indexed
+
+
+def search_event_ids(user, query, limit=SEARCH_DEFAULT_LIMIT):
+    """Return ids of ``user``'s events matching ``query``, best match first."""
+    return get_search_backend().search(user, query, limit)
+
+
+class EventSearchFilter(BaseFilterBackend):
+    """
+    ``?search=`` filter backed by the full-text index. Every word must match
+    the start of a word in the title, description or tags. Matches are read
+    in a subquery, so the filtered list is never truncated.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search_terms(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        return queryset.filter(pk__in=get_search_backend().matching(request.user, terms))
@@ -1,39 +1,74 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from .fieldsets import SparseFieldsMixin
+from .metrics import timed
 from .models import UserProfile, Tag, Event
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """Count the time spent producing ``data`` as the request's serialize phase."""
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+class UserProfileSerializer(SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = UserProfile
+        list_serializer_class = TimedListSerializer
         fields = ('id', 'birth_date', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
         # Ensure birth_date is included
-        data['birth_date'] = instance.birth_date.isoformat() if instance.birth_date else None
+        if 'birth_date' in self.fields:
+            data['birth_date'] = instance.birth_date.isoformat() if instance.birth_date else None
         return data
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
     
     class Meta:
         model = User
+        list_serializer_class = TimedListSerializer
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'profile')
         read_only_fields = ('id',)
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
+        list_serializer_class = TimedListSerializer
+        fields = ('id', 'name', 'usage_count', 'created_at')
+        read_only_fields = ('id', 'usage_count', 'created_at')
+
+    def validate_name(self, value):
+        request = self.context.get('request')
+        if request is not None:
+            tags = Tag.objects.filter(user=request.user, name=value)
+            if self.instance is not None:
+                tags = tags.exclude(pk=self.instance.pk)
+            if tags.exists():
+                raise serializers.ValidationError('You already have a tag with this name.')
+        return value
+
+class EventTagSerializer(TagSerializer):
+    """Tags nested in an event are matched by name, so existing names are allowed."""
+    class Meta(TagSerializer.Meta):
         fields = ('id', 'name', 'created_at')
-        read_only_fields = ('id', 'created_at')
 
-class EventSerializer(serializers.ModelSerializer):
-    tags = TagSerializer(many=True, required=False)
+    def validate_name(self, value):
+        return value
+
+class EventSerializer(SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    tags = EventTagSerializer(many=True, required=False)
     user = UserSerializer(read_only=True)
 
     class Meta:
         model = Event
+        list_serializer_class = TimedListSerializer
         fields = (
             'id', 'user', 'week_index', 'day_of_week', 'title',
             'description', 'icon', 'color', 'tags', 'created_at', 'updated_at'
@@ -45,9 +80,9 @@ class EventSerializer(serializers.ModelSerializer):
         event = Event.objects.create(**validated_data)
         
         # Handle tags
-        for tag_data in tags_data:
-            tag, _ = Tag.objects.get_or_create(**tag_data)
-            event.tags.add(tag)
+        if tags_data:
+            tags = Tag.objects.resolve(event.user, (tag_data['name'] for tag_data in tags_data))
+            event.tags.add(*tags.values())
         
         return event
 
@@ -61,9 +96,15 @@ class EventSerializer(serializers.ModelSerializer):
 
         # Update tags
         if tags_data:
-            instance.tags.clear()
-            for tag_data in tags_data:
-                tag, _ = Tag.objects.get_or_create(**tag_data)
-                instance.tags.add(tag)
+            tags = Tag.objects.resolve(instance.user, (tag_data['name'] for tag_data in tags_data))
+            instance.tags.set(tags.values())
+
+        return instance 
 
-        return instance 
\ No newline at end of file
+class EventListSerializer(EventSerializer):
+    """
+    Read-only event representation for list endpoints. The requester always
+    owns the events, so the nested ``user`` block is left out.
+    """
+    class Meta(EventSerializer.Meta):
+        fields = tuple(field for field in EventSerializer.Meta.fields if field != 'user')
@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .authentication import forget_cached_user
+from .cache import bump_data_version
+from .models import UserProfile, Tag, Event, EventTombstone, UserStats
+from .search import index_events, remove_events
+from .stats import mark_stats_changed
+from .sync import touch_events
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, instance, **kwargs):
+    bump_data_version(instance.user_id)
+    mark_stats_changed(instance.user_id)
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, **kwargs):
+    index_events([instance.pk])
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    remove_events([instance.pk])
+
+
+def tagged_events_changed(event_ids):
+    """Reindex events whose tags changed and move them up the change feed."""
+    if event_ids:
+        index_events(event_ids)
+        touch_events(event_ids)
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def event_tag_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            tagged_events_changed([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        tagged_events_changed(list(pk_set))
+    elif action == 'pre_clear':
+        # Handle the events once the clear has run, while their ids are known.
+        instance._cleared_event_ids = list(instance.events.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        tagged_events_changed(getattr(instance, '_cleared_event_ids', []))
+
+
+@receiver(post_save, sender=Tag)
+def tag_events_changed(sender, instance, created=False, **kwargs):
+    if not created:
+        tagged_events_changed(list(instance.events.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Tag)
+def collect_deleted_tag_events(sender, instance, **kwargs):
+    # Tag links are removed along with the tag without m2m signals, so the
+    # tagged events are gathered before the delete and handled after it.
+    instance._deleted_event_ids = list(instance.events.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def deleted_tag_events_changed(sender, instance, **kwargs):
+    tagged_events_changed(getattr(instance, '_deleted_event_ids', []))
+
+
+@receiver(post_delete, sender=Event)
+def record_event_tombstone(sender, instance, origin=None, **kwargs):
+    # Events removed along with their owner need no tombstone.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is not User:
+        EventTombstone.objects.create(user_id=instance.user_id, event_id=instance.pk)
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def event_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action.startswith('post_'):
+        bump_data_version(instance.user_id)
+        mark_stats_changed(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def count_tag_usage(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action.startswith('post_'):
+            Tag.objects.filter(pk=instance.pk).refresh_usage_counts()
+    elif action in ('post_add', 'post_remove'):
+        Tag.objects.filter(pk__in=pk_set).refresh_usage_counts()
+    elif action == 'pre_clear':
+        instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        Tag.objects.filter(pk__in=getattr(instance, '_cleared_tag_ids', [])).refresh_usage_counts()
+
+
+@receiver(pre_delete, sender=Event)
+def collect_deleted_event_tags(sender, instance, origin=None, **kwargs):
+    # Tag links are removed along with events without m2m signals, so the
+    # affected tags are gathered once per delete() call and recounted after.
+    if origin is instance:
+        origin._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif (
+        isinstance(origin, QuerySet) and origin.model is Event
+        and not hasattr(origin, '_deleted_tag_ids')
+    ):
+        links = Event.tags.through.objects.filter(event__in=origin)
+        origin._deleted_tag_ids = list(links.values_list('tag_id', flat=True).distinct())
+
+
+@receiver(post_delete, sender=Event)
+def recount_deleted_event_tags(sender, instance, origin=None, **kwargs):
+    tag_ids = getattr(origin, '_deleted_tag_ids', None)
+    if tag_ids:
+        origin._deleted_tag_ids = []
+        Tag.objects.filter(pk__in=tag_ids).refresh_usage_counts()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    bump_data_version(instance.user_id)
+    mark_stats_changed(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, **kwargs):
+    bump_data_version(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created=False, raw=False, **kwargs):
+    # A stale row from the start, so writes racing the first recompute
+    # always have a counter to bump.
+    if created and not raw:
+        UserStats.objects.bulk_create([UserStats(user=instance)], ignore_conflicts=True)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_authenticated_user(sender, instance, **kwargs):
+    forget_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_changed(sender, instance, **kwargs):
+    bump_data_version(instance.user_id)
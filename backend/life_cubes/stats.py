@@ -0,0 +1,85 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F, Max, Min
+
+from .aggregates import week_bucket
+from .models import WEEKS_PER_YEAR, Tag, Event, UserStats
+
+
+def compute_user_stats(user_id):
+    """Aggregate a user's events with three grouped queries."""
+    events = Event.objects.filter(user_id=user_id).order_by()
+    totals = events.aggregate(
+        total=Count('id'), first_week=Min('week_index'), last_week=Max('week_index')
+    )
+    per_year = (
+        events.annotate(year=week_bucket(WEEKS_PER_YEAR))
+        .values('year')
+        .annotate(count=Count('id'))
+        .order_by('year')
+    )
+    tags = (
+        Tag.objects.filter(user_id=user_id, usage_count__gt=0)
+        .annotate(count=F('usage_count'))
+        .values('id', 'name', 'created_at', 'count')
+        .order_by('name')
+    )
+    return {
+        'total_events': totals['total'],
+        'first_week': totals['first_week'],
+        'last_week': totals['last_week'],
+        'events_per_year': {str(row['year']): row['count'] for row in per_year},
+        'tags': [
+            {**tag, 'created_at': tag['created_at'].isoformat().replace('+00:00', 'Z')}
+            for tag in tags
+        ],
+    }
+
+
+def mark_stats_changed(*user_ids):
+    """
+    Make the stored stats of the given users stale. The counter lives on the
+    row, so every process sees the change and no cache eviction loses it.
+    """
+    UserStats.objects.filter(pk__in=set(user_ids)).update(version=F('version') + 1)
+
+
+def refresh_user_stats(user_id, version=None):
+    """
+    Recompute and store the stats of a user as of ``version``, the change
+    counter read before computing; writes racing the recompute bump the
+    counter past it and leave the row stale.
+    """
+    if version is None:
+        version = UserStats.objects.filter(pk=user_id).values_list('version', flat=True).first()
+    values = compute_user_stats(user_id)
+    values['total_tags'] = len(values['tags'])
+    values['computed_version'] = version or 0
+    stats = UserStats(user_id=user_id, version=version or 0, **values)
+    # A single INSERT ... ON CONFLICT DO UPDATE instead of a read and a write;
+    # the counter itself is only ever changed by mark_stats_changed.
+    UserStats.objects.bulk_create(
+        [stats],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=[*values, 'updated_at'],
+    )
+    return stats
+
+
+def get_user_stats(user):
+    """
+    Return the user's stats with a primary key read, recomputing them first
+    if the user's data changed since they were stored.
+    """
+    stats = UserStats.objects.filter(pk=user.pk).first()
+    if stats is None or stats.is_stale:
+        stats = refresh_user_stats(user.pk, stats.version if stats else 0)
+    return stats
+
+
+async def aget_user_stats(user):
+    """Async ``get_user_stats``; the rare recompute runs in a worker thread."""
+    stats = await UserStats.objects.filter(pk=user.pk).afirst()
+    if stats is None or stats.is_stale:
+        stats = await sync_to_async(refresh_user_stats)(user.pk, stats.version if stats else 0)
+    return stats
@@ -0,0 +1,82 @@
+import heapq
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .cache import get_data_version
+from .models import Tag
+
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+
+
+class TagPrefixIndex:
+    """
+    A user's tags sorted by case-folded name, so the tags starting with a
+    prefix are one contiguous slice found with two bisects.
+    """
+
+    def __init__(self, tags):
+        # tags: iterable of (id, name, usage_count)
+        entries = sorted(
+            (name.casefold(), -usage_count, name, pk) for pk, name, usage_count in tags
+        )
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def suggest(self, prefix, limit=SUGGEST_DEFAULT_LIMIT):
+        """Tags starting with ``prefix``, most used first, then by name."""
+        prefix = prefix.casefold()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + '\U0010ffff', lo=start)
+        matches = heapq.nsmallest(
+            limit, self.entries[start:end], key=lambda entry: (entry[1], entry[0])
+        )
+        return [
+            {'id': pk, 'name': name, 'usage_count': -negative_count}
+            for _, negative_count, name, pk in matches
+        ]
+
+
+class TagIndexCache:
+    """
+    Bounded LRU of per-user prefix indexes. Each index is stored with the
+    user's data version and rebuilt once that version moves on, which
+    happens on every tag and event change.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        version = get_data_version(user_id)
+        with self._lock:
+            cached = self._indexes.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._indexes.move_to_end(user_id)
+                return cached[1]
+
+        index = TagPrefixIndex(
+            Tag.objects.filter(user_id=user_id).values_list('id', 'name', 'usage_count')
+        )
+        with self._lock:
+            self._indexes[user_id] = (version, index)
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+tag_indexes = TagIndexCache(getattr(settings, 'TAG_SUGGEST_CACHE_SIZE', 1000))
+
+
+def suggest_tags(user, prefix, limit=SUGGEST_DEFAULT_LIMIT):
+    return tag_indexes.get(user.pk).suggest(prefix, limit)
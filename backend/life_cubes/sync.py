@@ -0,0 +1,146 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Event, EventTombstone, TombstoneWatermark
+
+CHANGES_DEFAULT_LIMIT = 500
+CHANGES_MAX_LIMIT = 1000
+TOMBSTONE_PRUNE_BATCH_SIZE = 1000
+
+# Changes are ordered by (timestamp, kind, id); upserts sort before deletes
+# that share a timestamp. A caught-up cursor sorts after both.
+UPSERT = 0
+DELETE = 1
+CAUGHT_UP = 2
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position):
+    timestamp, kind, pk = position
+    raw = json.dumps([timestamp.isoformat(), kind, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        timestamp, kind, pk = json.loads(raw)
+        position = datetime.fromisoformat(timestamp), int(kind), int(pk)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+    if timezone.is_naive(position[0]):
+        raise InvalidCursor('Invalid cursor')
+    return position
+
+
+def tombstone_cutoff(now=None):
+    """Tombstones older than this are pruned."""
+    return (now or timezone.now()) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def change_horizon(now=None):
+    """
+    Changes are handed out once they are older than this. Rows are stamped
+    before their transaction commits, so a write that commits late can carry
+    a timestamp behind rows that are already visible.
+    """
+    return (now or timezone.now()) - timedelta(seconds=settings.SYNC_CHANGE_LAG_SECONDS)
+
+
+def cursor_expired(user, position):
+    """
+    Whether tombstones of ``user`` after ``position`` have been pruned, so the
+    client has to start over with a full sync.
+    """
+    return TombstoneWatermark.objects.filter(user=user, pruned_until__gte=position[0]).exists()
+
+
+def prune_tombstones(batch_size=TOMBSTONE_PRUNE_BATCH_SIZE, now=None):
+    """
+    Delete tombstones older than the retention period in batches of
+    ``batch_size``, each in its own short transaction, and move the owners'
+    watermarks up to the newest deleted tombstone. Returns the number of
+    deleted tombstones.
+    """
+    expired = EventTombstone.objects.filter(deleted_at__lt=tombstone_cutoff(now))
+    expired = expired.order_by('deleted_at')
+    deleted = 0
+    while True:
+        ids = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        batch = EventTombstone.objects.filter(pk__in=ids)
+        newest = batch.order_by().values('user_id').annotate(pruned_until=Max('deleted_at'))
+        with transaction.atomic():
+            TombstoneWatermark.objects.bulk_create(
+                [TombstoneWatermark(**watermark) for watermark in newest],
+                update_conflicts=True, unique_fields=['user'], update_fields=['pruned_until'],
+            )
+            count, _ = batch.delete()
+        deleted += count
+
+
+def touch_events(event_ids):
+    """
+    Move events to the head of the change feed after a change that did not
+    save their row, such as a renamed or deleted tag.
+    """
+    Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+def _after(field, kind, position):
+    """Filter rows of ``kind`` that sort after ``position``."""
+    timestamp, cursor_kind, pk = position
+    later = Q(**{f'{field}__gt': timestamp})
+    if kind > cursor_kind:
+        return later | Q(**{field: timestamp})
+    if kind == cursor_kind:
+        return later | Q(**{field: timestamp, 'pk__gt': pk})
+    return later
+
+
+def collect_changes(user, since=None, limit=CHANGES_DEFAULT_LIMIT, now=None):
+    """
+    Return up to ``limit`` changes of ``user``'s events after the ``since``
+    position and up to the change horizon, as
+    ``(changes, next_position, has_more)``.
+
+    Each change is ``(position, kind, obj)`` where ``obj`` is an ``Event``
+    for upserts and an ``EventTombstone`` for deletes. Both sources are read
+    in index order and merged, so the cost depends on the page size rather
+    than on the size of the history. Once the changes are exhausted the next
+    position is the horizon itself, so the cursor of a caught-up client keeps
+    moving even when nothing changes.
+    """
+    horizon = change_horizon(now)
+    events = Event.objects.for_user(user).with_tags().filter(updated_at__lte=horizon)
+    events = events.order_by('updated_at', 'pk')
+    tombstones = EventTombstone.objects.filter(user=user, deleted_at__lte=horizon)
+    tombstones = tombstones.order_by('deleted_at', 'pk')
+    if since is not None:
+        events = events.filter(_after('updated_at', UPSERT, since))
+        tombstones = tombstones.filter(_after('deleted_at', DELETE, since))
+
+    merged = sorted(
+        [((event.updated_at, UPSERT, event.pk), UPSERT, event) for event in events[:limit + 1]]
+        + [((tomb.deleted_at, DELETE, tomb.pk), DELETE, tomb) for tomb in tombstones[:limit + 1]],
+        key=lambda change: change[0],
+    )
+    changes = merged[:limit]
+    has_more = len(merged) > limit
+    if has_more:
+        next_position = changes[-1][0]
+    else:
+        next_position = (horizon, CAUGHT_UP, 0)
+        if since is not None and since > next_position:
+            next_position = since
+    return changes, next_position, has_more
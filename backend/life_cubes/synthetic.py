@@ -0,0 +1,120 @@
+"""
+Reproducible synthetic users and events for benchmarks and load tests.
+
+Distributions are skewed the way real grids are: a few users have most of
+the events, events cluster in the recent past with a thin tail of planned
+future weeks, and a handful of each user's tags are used far more often
+than the rest.
+"""
+import math
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .bulk import BULK_MAX_EVENTS, bulk_create_events
+from .models import MAX_WEEK_INDEX, WEEKS_PER_YEAR, UserProfile
+
+SYNTHETIC_PREFIX = 'synthetic-'
+SYNTHETIC_PASSWORD = 'synthetic-pass-1'
+
+TAG_VOCABULARY = (
+    'family', 'friends', 'work', 'travel', 'health', 'school', 'music', 'sport',
+    'home', 'milestone', 'holiday', 'learning', 'reading', 'project', 'move',
+    'wedding', 'birthday', 'concert', 'hiking', 'running', 'cooking', 'art',
+    'volunteering', 'finance', 'career', 'pets', 'garden', 'gaming', 'film', 'photography',
+)
+ICONS = ('star', 'heart', 'briefcase', 'plane', 'book', 'music', 'home', 'trophy', 'camera', 'flag')
+COLORS = ('#ef4444', '#f97316', '#eab308', '#22c55e', '#3b82f6', '#8b5cf6', '#ec4899', None)
+TITLES = (
+    'Started {tag}', 'Big {tag} day', '{tag} trip', 'First {tag} milestone',
+    'Weekend of {tag}', '{tag} with friends', 'Finished {tag}', 'Planned {tag}',
+)
+# Share of events placed after the user's current week (plans and goals).
+FUTURE_SHARE = 0.05
+# Probabilities of an event carrying 0, 1, 2 or 3 tags.
+TAGS_PER_EVENT_WEIGHTS = (0.3, 0.4, 0.2, 0.1)
+
+
+def event_count(rng, mean):
+    """Log-normal event count around ``mean``: most users light, a few heavy."""
+    if mean <= 0:
+        return 0
+    sigma = 0.8
+    count = rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+    return min(int(count), MAX_WEEK_INDEX * 7)
+
+
+def event_week(rng, current_week):
+    if rng.random() < FUTURE_SHARE and current_week < MAX_WEEK_INDEX:
+        return rng.randint(current_week + 1, MAX_WEEK_INDEX)
+    # Denser toward the present, thinner in childhood.
+    return min(int(current_week * rng.betavariate(2.5, 1.2)), MAX_WEEK_INDEX)
+
+
+def generate_events(rng, current_week, count):
+    """Validated-data dicts for ``bulk_create_events``."""
+    tags = rng.sample(TAG_VOCABULARY, rng.randint(5, 20))
+    # Zipf-like weights: the first tags of the user's list dominate.
+    tag_weights = [1 / (rank ** 1.1) for rank in range(1, len(tags) + 1)]
+    events = []
+    for _ in range(count):
+        tag_count = rng.choices(range(4), TAGS_PER_EVENT_WEIGHTS)[0]
+        event_tags = set(rng.choices(tags, tag_weights, k=tag_count))
+        theme = next(iter(event_tags), rng.choice(tags))
+        events.append({
+            'week_index': event_week(rng, current_week),
+            # Weekends are busier.
+            'day_of_week': rng.choices(range(7), (1, 1, 1, 1, 1.3, 2, 2))[0],
+            'title': rng.choice(TITLES).format(tag=theme).capitalize(),
+            'description': f'Synthetic event about {theme}.' if rng.random() < 0.4 else '',
+            'icon': rng.choice(ICONS),
+            'color': rng.choice(COLORS),
+            'tags': [{'name': name} for name in sorted(event_tags)],
+        })
+    return events
+
+
+def clear_synthetic_users(prefix=SYNTHETIC_PREFIX):
+    _, deleted = User.objects.filter(username__startswith=prefix).delete()
+    return deleted.get(User._meta.label, 0)
+
+
+def seed_synthetic(users, events_per_user, seed=0, prefix=SYNTHETIC_PREFIX,
+                   password=SYNTHETIC_PASSWORD, today=None):
+    """
+    Create ``users`` users named ``<prefix><n>`` with on average
+    ``events_per_user`` events each. The same ``seed`` always produces the
+    same data. Returns ``(users created, events created)``.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    start = User.objects.filter(username__startswith=prefix).count()
+    # Hashing is deliberately slow, so every synthetic user shares one hash.
+    password_hash = make_password(password)
+
+    with transaction.atomic():
+        created_users = User.objects.bulk_create([
+            User(
+                username=f'{prefix}{start + number}',
+                email=f'{prefix}{start + number}@example.com',
+                password=password_hash,
+            )
+            for number in range(users)
+        ])
+        current_weeks = [
+            rng.randint(18 * WEEKS_PER_YEAR, 60 * WEEKS_PER_YEAR) for _ in created_users
+        ]
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, birth_date=today - timedelta(weeks=current_week))
+            for user, current_week in zip(created_users, current_weeks)
+        ])
+
+    created_events = 0
+    for user, current_week in zip(created_users, current_weeks):
+        events = generate_events(rng, current_week, event_count(rng, events_per_user))
+        for offset in range(0, len(events), BULK_MAX_EVENTS):
+            created_events += len(bulk_create_events(user, events[offset:offset + BULK_MAX_EVENTS]))
+    return len(created_users), created_events
@@ -1,3 +1,1204 @@
-from django.test import TestCase
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import os
+import struct
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .authentication import CustomJWTAuthentication
+from .benchmarks import find_regressions, run_benchmarks
+from .cache import BoundedLRUCache, stats as cache_stats
+from .metrics import MetricsMiddleware, registry
+from .export import CSV_TAG_SEPARATOR, EXPORT_FIELDS, iter_blocks
+from .grid import GRID_HEADER, GRID_MAGIC, build_grid_summary, pack_grid_summary
+from .life_calendar import date_to_week, week_end, weeks_to_dates
+from .models import (
+    UserProfile, Tag, Event, EventTombstone, TombstoneWatermark, UserStats, MAX_WEEK_INDEX,
+)
+from .pagination import EventKeysetPagination
+from .renderers import FastJSONRenderer
+from .search import FallbackSearchBackend, get_search_backend, rebuild_index
+from .serializers import EventListSerializer
+from .stats import aget_user_stats, get_user_stats, refresh_user_stats
+from .sync import CAUGHT_UP, UPSERT, collect_changes, decode_cursor, encode_cursor, prune_tombstones
+from .synthetic import seed_synthetic
+from .tokens import (
+    BlacklistCache, CachedBlacklistRefreshToken, blacklist_cache, prune_expired_tokens,
+)
+
+
+def load_settings(**env):
+    """Execute the project settings with ``env`` added to the environment."""
+    path = importlib.util.find_spec('core.settings').origin
+    spec = importlib.util.spec_from_file_location('profile_settings', path)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(os.environ, env):
+        spec.loader.exec_module(module)
+    return module
+
+
+class DatabaseProfileTests(TestCase):
+
+    def test_sqlite_profiles(self):
+        options = load_settings(DB_ENGINE='sqlite').DATABASES['default']['OPTIONS']
+        self.assertEqual(options, {'timeout': 20})
+
+        with tempfile.TemporaryDirectory() as directory:
+            databases = load_settings(
+                DB_ENGINE='sqlite-wal', DB_SQLITE_TIMEOUT='7', DB_NAME=f'{directory}/wal.sqlite3'
+            ).DATABASES
+            self.assertEqual(databases['default']['OPTIONS']['timeout'], 7)
+            self.assertEqual(databases['default']['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+            handler = ConnectionHandler(databases)
+            try:
+                with handler['default'].cursor() as cursor:
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(cursor.fetchone(), (7000,))
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone(), ('wal',))
+            finally:
+                handler.close_all()
+
+    def test_postgresql_profiles(self):
+        database = load_settings(DB_ENGINE='postgresql').DATABASES['default']
+        self.assertEqual((database['ENGINE'], database['CONN_MAX_AGE']), (
+            'django.db.backends.postgresql', 60
+        ))
+        self.assertNotIn('pool', database['OPTIONS'])
+        database = load_settings(DB_ENGINE='postgresql', DB_POOL='true').DATABASES['default']
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 10)
+
+
+class EventQueryCountTests(TestCase):
+    """
+    Pin the number of queries issued by the event read endpoints so that
+    they stay constant no matter how many events a user has.
+    """
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'secret-pass-1')
+        UserProfile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tags = [Tag.objects.create(user=self.user, name=f'tag-{i}') for i in range(3)]
+
+    def create_events(self, count):
+        for i in range(count):
+            event = Event.objects.create(
+                user=self.user,
+                week_index=i,
+                day_of_week=i % 7,
+                title=f'Event {i}',
+                icon='star',
+            )
+            event.tags.set(self.tags[:i % 3 + 1])
+
+    def assertConstantQueries(self, num, url):
+        for count in (1, 25):
+            Event.objects.all().delete()
+            self.create_events(count)
+            with self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_list(self):
+        # fingerprint, events, prefetched tags
+        self.assertConstantQueries(3, '/api/v1/events/')
+
+    def test_list_projection_matches_serializer(self):
+        self.create_events(5)
+        Event.objects.filter(week_index=1).update(
+            color='#ef4444', description='Caf\u00e9 \u2028 line'
+        )
+        response = self.client.get('/api/v1/events/')
+        events = Event.objects.for_user(self.user).with_tags()
+        expected = JSONRenderer().render(EventListSerializer(events, many=True).data)
+        self.assertEqual(response.content, expected)
+
+    def test_list_omits_owner(self):
+        self.create_events(1)
+        response = self.client.get('/api/v1/events/')
+        self.assertNotIn('user', response.json()[0])
+        self.assertEqual(len(response.json()[0]['tags']), 1)
+
+    def test_retrieve(self):
+        self.create_events(1)
+        event = Event.objects.get()
+        # fingerprint, event with owner and profile, prefetched tags
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/v1/events/{event.pk}/')
+        self.assertEqual(response.json()['user']['id'], self.user.pk)
+
+    def test_week_range(self):
+        self.assertConstantQueries(3, '/api/v1/events/week_range/?start_week=0&end_week=100')
+
+    def test_dashboard(self):
+        # fingerprint, stored stats, stats recomputation (3 aggregates and an
+        # upsert) after the writes, recent events, their tags
+        self.assertConstantQueries(8, '/api/v1/dashboard/')
+
+    def test_aggregate(self):
+        # fingerprint and one grouped query, whatever the grouping
+        for group in ('year', 'decade', 'tag'):
+            self.assertConstantQueries(2, f'/api/v1/events/aggregate/{group}/?tags=tag-1')
+        response = self.client.get('/api/v1/events/aggregate/tag/')
+        self.assertEqual([bucket['count'] for bucket in response.json()['buckets']], [25, 16, 8])
+
+    def test_dashboard_unchanged_stats(self):
+        self.create_events(10)
+        self.client.get('/api/v1/dashboard/')
+        # fingerprint, stored stats, recent events, their tags; the query
+        # string only sidesteps the response cache
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/v1/dashboard/?view=full')
+        self.assertEqual(response.json()['total_events'], 10)
+
+    def test_not_modified(self):
+        self.create_events(3)
+        response = self.client.get('/api/v1/events/')
+        # only the fingerprint is computed
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/events/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        Event.objects.first().delete()
+        response = self.client.get('/api/v1/events/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match_any(self):
+        response = self.client.get('/api/v1/events/999999/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+        self.create_events(1)
+        url = f'/api/v1/events/{Event.objects.get().pk}/'
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='*').status_code, 304)
+
+    def test_last_modified(self):
+        now = time.time()
+        with mock.patch('time.time', return_value=now):
+            self.create_events(1)
+            # a change in the current second is no usable validator
+            self.assertNotIn('Last-Modified', self.client.get('/api/v1/events/'))
+        with mock.patch('time.time', return_value=now + 2):
+            since = self.client.get('/api/v1/events/')['Last-Modified']
+            response = self.client.get('/api/v1/events/', HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(response.status_code, 304)
+            # renaming a tag changes the list without touching any event
+            self.tags[0].name = 'renamed'
+            self.tags[0].save()
+        with mock.patch('time.time', return_value=now + 4):
+            response = self.client.get('/api/v1/events/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        cache_stats.reset()
+        self.user = User.objects.create_user('cached', 'cached@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Tag.objects.create(user=self.user, name='home')
+
+    def tag_names(self):
+        return [tag['name'] for tag in self.client.get('/api/v1/tags/').json()['results']]
+
+    def test_hit_miss_and_invalidation(self):
+        self.assertEqual(self.tag_names(), ['home'])
+        self.assertEqual(self.tag_names(), ['home'])
+        self.assertEqual(cache_stats.as_dict(), {'hits': 1, 'misses': 1, 'evictions': 0})
+
+        self.client.post('/api/v1/tags/', {'name': 'garden'})
+        self.assertEqual(sorted(self.tag_names()), ['garden', 'home'])
+        self.assertEqual(cache_stats.misses, 2)
+        # query strings are cached separately
+        self.client.get('/api/v1/tags/?search=gar')
+        self.assertEqual(cache_stats.misses, 3)
+
+    def test_lru_eviction(self):
+        cache = BoundedLRUCache('test-lru-entries', {'OPTIONS': {'MAX_ENTRIES': 2}})
+        cache.clear()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        self.assertEqual(cache_stats.evictions, 1)
+
+        cache = BoundedLRUCache('test-lru-bytes', {'OPTIONS': {'MAX_BYTES': 300}})
+        cache.clear()
+        for key in 'abc':
+            cache.set(key, key * 100)
+        self.assertEqual([cache.get(key) for key in 'abc'], [None, 'b' * 100, 'c' * 100])
+
+    def test_shared_backend_for_several_workers(self):
+        self.assertEqual(load_settings().RESPONSE_CACHE_BACKEND, 'life_cubes.cache.BoundedLRUCache')
+        responses = load_settings(WEB_CONCURRENCY='4').CACHES['responses']
+        self.assertEqual(responses['BACKEND'], 'django.core.cache.backends.db.DatabaseCache')
+        self.assertEqual(responses['LOCATION'], 'life_cubes_response_cache')
+        redis_url = 'redis://cache:6379/1'
+        responses = load_settings(WEB_CONCURRENCY='4', REDIS_URL=redis_url).CACHES['responses']
+        self.assertEqual(responses['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+        self.assertEqual(responses['LOCATION'], redis_url)
+        backend = 'django.core.cache.backends.locmem.LocMemCache'
+        settings_module = load_settings(WEB_CONCURRENCY='4', RESPONSE_CACHE_BACKEND=backend)
+        responses = settings_module.CACHES['responses']
+        self.assertEqual(responses['BACKEND'], backend)
+
+    def test_database_backend(self):
+        with self.settings(CACHES={**settings.CACHES, 'responses': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'life_cubes_response_cache',
+        }}):
+            call_command('createcachetable', verbosity=0)
+            self.assertEqual(self.tag_names(), ['home'])
+            self.assertEqual(self.tag_names(), ['home'])
+            Tag.objects.create(user=self.user, name='attic')
+            self.assertEqual(sorted(self.tag_names()), ['attic', 'home'])
+        self.assertEqual((cache_stats.hits, cache_stats.misses), (1, 2))
+
+
+class RendererTests(TestCase):
+
+    def test_matches_json_renderer(self):
+        data = {
+            'id': 1, 'color': None, 'ratio': 0.5, 'price': Decimal('1.10'), 'keys': {2: 'two'},
+            'at': timezone.now(), 'text': 'line\u2028break', 'items': [[], {}, (1, 2)],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_non_finite_floats(self):
+        for value in (float('nan'), float('inf'), -float('inf')):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'events': [{'ratio': value, 'color': None}]})
+        renderer = FastJSONRenderer()
+        renderer.strict = False
+        self.assertEqual(renderer.render([float('nan')]), b'[NaN]')
+
+
+class AsyncReadTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('streamer', 'streamer@example.com', 'secret-pass-1')
+        tag = Tag.objects.create(user=self.user, name='music')
+        for i in range(3):
+            event = Event.objects.create(
+                user=self.user, week_index=i, day_of_week=i, title=f'Gig {i}', icon='note'
+            )
+            event.tags.add(tag)
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'AUTHORIZATION': f'Bearer {token}'}
+
+    async def test_matches_sync_payloads(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        paths = (
+            'events/', 'events/week_range/?start_week=1&end_week=2', 'events/grid/', 'dashboard/',
+        )
+        for path in paths:
+            response = await self.async_client.get(f'/api/v1/async/{path}', headers=self.auth)
+            self.assertEqual(response.status_code, 200)
+            expected = await sync_to_async(client.get)(f'/api/v1/{path}')
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get('/api/v1/async/events/')
+        self.assertEqual(response.status_code, 401)
+
+
+class MetricsTests(TestCase):
+
+    def test_request_metrics(self):
+        registry.reset()
+        user = User.objects.create_user('watcher', 'watcher@example.com', 'secret-pass-1')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/v1/events/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            'life_cubes_requests_total{view="api_v1:event-list",method="GET",status="200"} 1', body
+        )
+        self.assertIn(
+            'life_cubes_serialize_duration_seconds_count'
+            '{view="api_v1:event-list",method="GET"} 1',
+            body,
+        )
+
+    def access_token(self):
+        user = User.objects.create_user('async-watcher', 'async@example.com', 'secret-pass-1')
+        return RefreshToken.for_user(user).access_token
+
+    async def test_async_requests(self):
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(get_response)))
+
+        registry.reset()
+        token = await sync_to_async(self.access_token)()
+        response = await self.async_client.get(
+            '/api/v1/async/events/', headers={'AUTHORIZATION': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        # queries made on the ORM's worker thread are counted too
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    def test_metrics_access(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 403)
+        with self.settings(METRICS_TOKEN='scrape-token'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            response = self.client.get(
+                '/metrics', REMOTE_ADDR='203.0.113.7', HTTP_AUTHORIZATION='Bearer scrape-token'
+            )
+            self.assertEqual(response.status_code, 200)
+
+
+class TagUsageTests(TestCase):
+
+    def test_usage_counts_follow_events(self):
+        user = User.objects.create_user('tagger', 'tagger@example.com', 'secret-pass-1')
+        client = APIClient()
+        client.force_authenticate(user)
+        payload = {'week_index': 1, 'day_of_week': 1, 'title': 'Trip', 'icon': 'plane'}
+        tagged = {**payload, 'tags': [{'name': 'travel'}]}
+        first = client.post('/api/v1/events/', tagged, format='json')
+        client.post('/api/v1/events/bulk/', [tagged] * 2, format='json')
+        self.assertEqual(Tag.objects.get(user=user, name='travel').usage_count, 3)
+
+        client.delete(f"/api/v1/events/{first.json()['id']}/")
+        Event.objects.filter(user=user)[:1].get().tags.clear()
+        self.assertEqual(Tag.objects.get(user=user, name='travel').usage_count, 1)
+
+        response = client.post('/api/v1/tags/', {'name': 'travel'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_suggest(self):
+        user = User.objects.create_user('typist', 'typist@example.com', 'secret-pass-1')
+        client = APIClient()
+        client.force_authenticate(user)
+        Tag.objects.bulk_create([
+            Tag(user=user, name='Running', usage_count=2),
+            Tag(user=user, name='reading', usage_count=5),
+            Tag(user=user, name='work', usage_count=9),
+        ])
+        response = client.get('/api/v1/tags/suggest/?prefix=R')
+        self.assertEqual([tag['name'] for tag in response.json()], ['reading', 'Running'])
+        with self.assertNumQueries(0):
+            client.get('/api/v1/tags/suggest/?prefix=re')
+
+        client.post('/api/v1/tags/', {'name': 'recipes'})
+        response = client.get('/api/v1/tags/suggest/?prefix=rec')
+        self.assertEqual([tag['name'] for tag in response.json()], ['recipes'])
+
+
+class AuthenticationTests(TestCase):
+
+    def setUp(self):
+        caches[settings.AUTH_USER_CACHE_ALIAS].clear()
+        self.user = User.objects.create_user('holder', 'holder@example.com', 'secret-pass-1')
+        self.authentication = CustomJWTAuthentication()
+
+    def token(self):
+        return AccessToken.for_user(self.user)
+
+    def test_cached_user(self):
+        token = self.token()
+        self.assertEqual(self.authentication.get_user(token), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authentication.get_user(token), self.user)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(token)
+
+    def test_revoked_token_on_cache_hit(self):
+        with mock.patch.object(jwt_settings, 'CHECK_REVOKE_TOKEN', True):
+            old_token = self.token()
+            self.user.set_password('secret-pass-2')
+            self.user.save()
+            # a token issued after the change puts the new password hash in the cache
+            self.authentication.get_user(self.token())
+            with self.assertNumQueries(0), self.assertRaises(AuthenticationFailed):
+                self.authentication.get_user(old_token)
+            with self.assertRaises(AuthenticationFailed):
+                async_to_sync(self.authentication.aget_user)(old_token)
+
+    def test_cookie_writes_require_csrf(self):
+        client = APIClient(enforce_csrf_checks=True)
+        payload = {'week_index': 1, 'day_of_week': 1, 'title': 'Lunch', 'icon': 'cup'}
+        client.cookies[settings.SIMPLE_JWT['AUTH_COOKIE']] = str(self.token())
+        self.assertEqual(client.get('/api/v1/events/').status_code, 200)
+        self.assertEqual(client.post('/api/v1/events/', payload, format='json').status_code, 403)
+
+        client = APIClient(enforce_csrf_checks=True)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token()}')
+        self.assertEqual(client.post('/api/v1/events/', payload, format='json').status_code, 201)
+
+
+class TokenTests(TestCase):
+
+    def setUp(self):
+        blacklist_cache.clear()
+        self.user = User.objects.create_user('holder', 'holder@example.com', 'secret-pass-1')
+
+    def outstanding(self, jti, expires_at):
+        return OutstandingToken.objects.create(
+            user=self.user, jti=jti, token=jti, expires_at=expires_at
+        )
+
+    def test_prune_expired_tokens(self):
+        now = timezone.now()
+        for number in range(3):
+            token = self.outstanding(f'expired-{number}', now - timedelta(days=number + 1))
+        BlacklistedToken.objects.create(token=token)
+        live = self.outstanding('live', now + timedelta(days=1))
+        BlacklistedToken.objects.create(token=live)
+
+        self.assertEqual(
+            prune_expired_tokens(batch_size=2, now=now), {'outstanding': 3, 'blacklisted': 1}
+        )
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertEqual(BlacklistedToken.objects.get().token, live)
+        self.assertEqual(prune_expired_tokens(now=now), {'outstanding': 0, 'blacklisted': 0})
+
+    def test_blacklist_cache_after_rotation(self):
+        client = APIClient()
+        refresh = str(CachedBlacklistRefreshToken.for_user(self.user))
+        client.cookies[settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH']] = refresh
+        self.assertEqual(client.post('/api/v1/auth/refresh/').status_code, 200)
+
+        # the rotated token is blacklisted and known to the cache from then on
+        client.cookies[settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH']] = refresh
+        response = client.post('/api/v1/auth/refresh/')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('blacklisted', response.json()['error'])
+        with self.assertNumQueries(0), self.assertRaises(TokenError):
+            CachedBlacklistRefreshToken(refresh)
+
+    def test_blacklist_found_in_database_is_cached(self):
+        token = CachedBlacklistRefreshToken.for_user(self.user)
+        token.blacklist()
+        blacklist_cache.clear()
+        with self.assertRaises(TokenError):
+            CachedBlacklistRefreshToken(str(token))
+        with self.assertNumQueries(0), self.assertRaises(TokenError):
+            CachedBlacklistRefreshToken(str(token))
+
+    def test_blacklist_cache_evicts_least_recently_used(self):
+        cache = BlacklistCache(max_size=2)
+        cache.add('a')
+        cache.add('b')
+        self.assertIn('a', cache)
+        cache.add('c')
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+
+class BulkTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('batcher', 'batcher@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {'week_index': 1, 'day_of_week': 1, 'title': 'Run', 'icon': 'shoe'}
+
+    def bulk(self, method, data):
+        return getattr(self.client, method)('/api/v1/events/bulk/', data, format='json')
+
+    def test_create(self):
+        response = self.bulk('post', [
+            {**self.payload, 'tags': [{'name': 'sport'}]},
+            {**self.payload, 'week_index': 2, 'tags': [{'name': 'sport'}, {'name': 'rain'}]},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(event['week_index'] for event in response.json()), [1, 2])
+        self.assertEqual(Tag.objects.get(user=self.user, name='sport').usage_count, 2)
+
+        response = self.bulk('post', [self.payload, {**self.payload, 'day_of_week': 9}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Event.objects.filter(user=self.user).count(), 2)
+
+    def test_update(self):
+        first, second = self.bulk('post', [self.payload, self.payload]).json()
+        response = self.bulk('patch', [
+            {'id': first['id'], 'title': 'Long run'},
+            {'id': str(second['id']), 'tags': [{'name': 'race'}]},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Event.objects.get(pk=first['id']).title, 'Long run')
+        tags = Event.objects.get(pk=second['id']).tags.values_list('name', flat=True)
+        self.assertEqual(list(tags), ['race'])
+
+        other = User.objects.create_user('stranger', 'stranger@example.com', 'secret-pass-1')
+        foreign = Event.objects.create(user=other, **self.payload)
+        response = self.bulk('patch', [{'id': foreign.pk, 'title': 'Mine'}])
+        self.assertEqual(response.json()['ids'], [foreign.pk])
+        for items in ([{'id': 'abc'}], [{'title': 'No id'}], [1], {'id': first['id']}):
+            self.assertEqual(self.bulk('patch', items).status_code, 400, items)
+
+    def test_delete(self):
+        events = self.bulk('post', [self.payload] * 3).json()
+        response = self.bulk('delete', {'ids': [events[0]['id'], events[1]['id'], 999999]})
+        self.assertEqual(response.json(), {'deleted': 2})
+        for data in ([events[2]['id']], {'ids': ['abc']}, {'ids': []}, {'ids': 'x'}, {}):
+            self.assertEqual(self.bulk('delete', data).status_code, 400, data)
+        self.assertEqual(Event.objects.filter(user=self.user).count(), 1)
+
+    def test_delete_is_set_based(self):
+        tagged = {**self.payload, 'tags': [{'name': 'sport'}]}
+        for count in (5, 50):
+            ids = [event['id'] for event in self.bulk('post', [tagged] * count).json()]
+            # savepoint, events, tag links, tombstones, link delete, event
+            # delete, tag counts, search index, stats, release
+            with self.assertNumQueries(10):
+                response = self.bulk('delete', {'ids': ids})
+            self.assertEqual(response.json(), {'deleted': count})
+        self.assertFalse(Event.objects.filter(user=self.user).exists())
+        self.assertEqual(EventTombstone.objects.filter(user=self.user).count(), 55)
+        self.assertEqual(Tag.objects.get(user=self.user, name='sport').usage_count, 0)
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('pager', 'pager@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # several events share a week and a day, so only the id breaks ties
+        for week, day in ((2, 0), (1, 5), (1, 5), (1, 5), (1, 2), (0, 6), (2, 0)):
+            Event.objects.create(
+                user=self.user, week_index=week, day_of_week=day, title='E', icon='x'
+            )
+        self.expected = list(
+            Event.objects.order_by('week_index', 'day_of_week', 'id').values_list('id', flat=True)
+        )
+
+    def pages(self, url):
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids.append([event['id'] for event in data['results']])
+            url = data['next']
+        return ids
+
+    def test_cursor_round_trip(self):
+        pages = self.pages('/api/v1/events/?page_size=2')
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        pages = self.pages('/api/v1/events/week_range/?start_week=1&end_week=1&page_size=3')
+        self.assertEqual(sum(pages, []), self.expected[1:5])
+        # without cursor or page_size the full list comes back unpaginated
+        self.assertEqual(len(self.client.get('/api/v1/events/').json()), 7)
+
+    def test_cursor_encodes_last_row(self):
+        pagination = EventKeysetPagination()
+        event = Event.objects.get(pk=self.expected[2])
+        cursor = pagination.encode_cursor(event)
+        self.assertEqual(pagination.decode_cursor(cursor), (1, 5, event.pk))
+        data = self.client.get(f'/api/v1/events/?cursor={cursor}').json()
+        self.assertEqual([row['id'] for row in data['results']], self.expected[3:])
+        self.assertIsNone(data['next'])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-base64!', 'bm90IGpzb24', 'WzEsMl0', 'WyJhIiwxLDJd'):
+            response = self.client.get(f'/api/v1/events/?cursor={cursor}')
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+class GridTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('gridder', 'gridder@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for day, color, icon in ((1, '#ef4444', 'star'), (1, '#ef4444', 'star'), (3, None, 'moon')):
+            Event.objects.create(
+                user=self.user, week_index=0, day_of_week=day, title='Week 0', color=color,
+                icon=icon,
+            )
+        Event.objects.create(
+            user=self.user, week_index=MAX_WEEK_INDEX, day_of_week=6, title='Last', icon='caf\u00e9'
+        )
+
+    def unpack(self, body):
+        magic, weeks, color_count, icon_count = GRID_HEADER.unpack_from(body)
+        offset = GRID_HEADER.size
+        columns = {}
+        for key, code, size in (('counts', 'H', 2), ('day_masks', 'B', 1),
+                                ('colors', 'H', 2), ('icons', 'H', 2)):
+            columns[key] = list(struct.unpack_from(f'<{weeks}{code}', body, offset))
+            offset += weeks * size
+        palette = []
+        for _ in range(color_count + icon_count):
+            length = body[offset]
+            # a missing color or icon is packed as an empty string
+            palette.append(body[offset + 1:offset + 1 + length].decode('utf-8') or None)
+            offset += 1 + length
+        self.assertEqual((magic, offset), (GRID_MAGIC, len(body)))
+        columns['color_palette'] = [None] + palette[:color_count]
+        columns['icon_palette'] = [None] + palette[color_count:]
+        return weeks, columns
+
+    def test_json_summary(self):
+        data = self.client.get('/api/v1/events/grid/').json()
+        self.assertEqual(data['weeks'], MAX_WEEK_INDEX + 1)
+        self.assertEqual((data['counts'][0], data['day_masks'][0]), (3, 0b1010))
+        self.assertEqual(data['color_palette'][data['colors'][0]], '#ef4444')
+        self.assertEqual(data['icon_palette'][data['icons'][0]], 'star')
+        self.assertEqual(data['icon_palette'][data['icons'][MAX_WEEK_INDEX]], 'caf\u00e9')
+        self.assertEqual((data['counts'][1], data['colors'][1], data['icons'][1]), (0, 0, 0))
+
+    def test_binary_layout_round_trip(self):
+        expected = self.client.get('/api/v1/events/grid/').json()
+        response = self.client.get('/api/v1/events/grid/', HTTP_ACCEPT='application/octet-stream')
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        weeks, columns = self.unpack(response.content)
+        self.assertEqual(weeks, expected['weeks'])
+        for key, value in columns.items():
+            self.assertEqual(value, expected[key], key)
+        # 10 byte header, four columns of 2 + 1 + 2 + 2 bytes per week and
+        # the length-prefixed palettes ('#ef4444', None, 'star', 'caf\u00e9')
+        self.assertEqual(len(response.content), 10 + 7 * weeks + 8 + 1 + 5 + 6)
+        summary = build_grid_summary(Event.objects.for_user(self.user))
+        self.assertEqual(pack_grid_summary(summary), response.content)
+        packed = self.client.get('/api/v1/events/grid/?format=bin').content
+        self.assertEqual(packed, response.content)
+
+    def test_accept_negotiation(self):
+        response = self.client.get('/api/v1/events/grid/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        response = self.client.get('/api/v1/events/grid/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 406)
+        response = self.client.get(
+            '/api/v1/events/grid/', HTTP_ACCEPT='application/octet-stream;q=0.5, application/json'
+        )
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+
+@override_settings(SYNC_CHANGE_LAG_SECONDS=0)
+class SyncTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('syncer', 'syncer@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='gym')
+        self.events = []
+        for week in range(3):
+            event = Event.objects.create(
+                user=self.user, week_index=week, day_of_week=0, title=f'Session {week}',
+                icon='dumbbell',
+            )
+            event.tags.add(self.tag)
+            self.events.append(event)
+
+    def changes(self, cursor=None, limit=None):
+        params = {key: value for key, value in (('since', cursor), ('limit', limit)) if value}
+        response = self.client.get('/api/v1/events/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pages(self):
+        first = self.changes(limit=2)
+        self.assertTrue(first['has_more'])
+        second = self.changes(first['cursor'], limit=2)
+        self.assertFalse(second['has_more'])
+        titles = [change['event']['title'] for change in first['changes'] + second['changes']]
+        self.assertEqual(titles, ['Session 0', 'Session 1', 'Session 2'])
+
+        done = self.changes(second['cursor'])
+        self.assertEqual(done['changes'], [])
+        position = decode_cursor(done['cursor'])
+        self.assertEqual(position[1], CAUGHT_UP)
+        self.assertGreaterEqual(position, decode_cursor(second['cursor']))
+        response = self.client.get('/api/v1/events/changes/?since=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+    def test_deletes_become_tombstones(self):
+        cursor = self.changes()['cursor']
+        self.client.delete(f'/api/v1/events/{self.events[0].pk}/')
+        url = f'/api/v1/events/{self.events[1].pk}/'
+        self.client.patch(url, {'title': 'Rest day'}, format='json')
+        changes = self.changes(cursor)['changes']
+        self.assertEqual(changes[0], {'type': 'deleted', 'id': self.events[0].pk})
+        self.assertEqual(changes[1]['type'], 'updated')
+        self.assertEqual(changes[1]['event']['title'], 'Rest day')
+
+    def test_tag_changes_update_tagged_events(self):
+        cursor = self.changes()['cursor']
+        self.tag.refresh_from_db()
+        self.tag.name = 'fitness'
+        self.tag.save()
+        data = self.changes(cursor)
+        self.assertEqual(len(data['changes']), 3)
+        self.assertEqual(data['changes'][0]['event']['tags'][0]['name'], 'fitness')
+
+        self.tag.delete()
+        changes = self.changes(data['cursor'])['changes']
+        self.assertEqual([change['event']['tags'] for change in changes], [[], [], []])
+
+        cursor = self.changes()['cursor']
+        self.events[0].tags.add(Tag.objects.create(user=self.user, name='yoga'))
+        changes = self.changes(cursor)['changes']
+        self.assertEqual([change['event']['id'] for change in changes], [self.events[0].pk])
+
+    def test_tombstone_retention(self):
+        Event.objects.filter(pk=self.events[0].pk).delete()
+        old = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+        EventTombstone.objects.update(deleted_at=old)
+        recent = self.events[1].pk
+        self.events[1].delete()
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertEqual(list(EventTombstone.objects.values_list('event_id', flat=True)), [recent])
+
+        self.assertEqual(TombstoneWatermark.objects.get(user=self.user).pruned_until, old)
+
+        expired = encode_cursor((old, UPSERT, 0))
+        response = self.client.get('/api/v1/events/changes/', {'since': expired})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.json()['code'], 'resync_required')
+        later = encode_cursor((old + timedelta(seconds=1), UPSERT, 0))
+        changes = self.changes(later)['changes']
+        self.assertEqual([change['type'] for change in changes], ['created', 'deleted'])
+
+    def test_idle_past_retention(self):
+        old = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 10)
+        self.events[0].delete()
+        EventTombstone.objects.update(deleted_at=old)
+        Event.objects.filter(user=self.user).update(updated_at=old - timedelta(days=1))
+        self.assertEqual(prune_tombstones(), 1)
+
+        cursor = self.changes()['cursor']
+        for _ in range(2):
+            data = self.changes(cursor)
+            self.assertEqual(data['changes'], [])
+            cursor = data['cursor']
+        deleted = self.events[1].pk
+        self.events[1].delete()
+        self.assertEqual(self.changes(cursor)['changes'], [{'type': 'deleted', 'id': deleted}])
+
+    @override_settings(SYNC_CHANGE_LAG_SECONDS=60)
+    def test_recent_changes_held_back(self):
+        now = timezone.now()
+        changes, position, _ = collect_changes(self.user, now=now)
+        self.assertEqual(changes, [])
+        # a write stamped behind the horizon that only commits afterwards
+        Event.objects.filter(pk=self.events[2].pk).update(updated_at=now - timedelta(seconds=30))
+        changes, _, _ = collect_changes(self.user, position, now=now + timedelta(seconds=61))
+        self.assertEqual([obj.pk for _, _, obj in changes][0], self.events[2].pk)
+        self.assertEqual(len(changes), 3)
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('seeker', 'seeker@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='hiking')
+        self.trail = Event.objects.create(
+            user=self.user, week_index=1, day_of_week=1, title='Mountain trail',
+            description='Long walk along the ridge', icon='mountain',
+        )
+        self.trail.tags.add(self.tag)
+        Event.objects.create(
+            user=self.user, week_index=2, day_of_week=2, title='Concert', icon='note'
+        )
+        other = User.objects.create_user('other', 'other@example.com', 'secret-pass-1')
+        Event.objects.create(
+            user=other, week_index=1, day_of_week=1, title='Mountain hut', icon='home'
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/v1/events/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [event['title'] for event in response.json()]
+
+    def test_prefix_terms_across_columns(self):
+        self.assertEqual(self.search('mount'), ['Mountain trail'])
+        self.assertEqual(self.search('walk hik'), ['Mountain trail'])
+        self.assertEqual(self.search('concert trail'), [])
+        self.assertEqual(self.client.get('/api/v1/events/search/?q=x&limit=0').status_code, 400)
+
+    def test_terms_do_not_match_owner(self):
+        for query in ('u', f'u{self.user.pk}', 'owner'):
+            self.assertEqual(self.search(query), [], query)
+
+    def test_tag_changes_reindex(self):
+        self.tag.name = 'climbing'
+        self.tag.save()
+        self.assertEqual(self.search('climb'), ['Mountain trail'])
+        self.assertEqual(self.search('hiking'), [])
+        self.tag.delete()
+        self.assertEqual(self.search('climb'), [])
+        self.assertEqual(self.search('trail'), ['Mountain trail'])
+
+    def test_list_filter(self):
+        Event.objects.bulk_create(
+            Event(user=self.user, week_index=week, day_of_week=0, title='Trail run', icon='run')
+            for week in range(10, 220)
+        )
+        rebuild_index()
+        for backend in (get_search_backend(), FallbackSearchBackend()):
+            caches['responses'].clear()
+            with mock.patch('life_cubes.search.get_search_backend', return_value=backend):
+                # fingerprint, events narrowed by a subquery, their tags
+                with self.assertNumQueries(3):
+                    response = self.client.get('/api/v1/events/', {'search': 'trail'})
+            self.assertEqual(len(response.json()), 211)
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('exporter', 'exporter@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        tags = [Tag.objects.create(user=self.user, name=name) for name in ('travel', 'family')]
+        self.events = [
+            Event.objects.create(
+                user=self.user, week_index=week, day_of_week=day, title=title,
+                description=description, icon='plane', color=color,
+            )
+            for week, day, title, description, color in (
+                (3, 1, 'Caf\u00e9 trip', 'Line one\nline "two"', '#ef4444'),
+                (1, 4, 'Visit', '', None),
+            )
+        ]
+        self.events[0].tags.set(tags)
+        other = User.objects.create_user('hidden', 'hidden@example.com', 'secret-pass-1')
+        Event.objects.create(user=other, week_index=0, day_of_week=0, title='Private', icon='x')
+
+    def export(self, query=''):
+        response = self.client.get(f'/api/v1/events/export/{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="events.ndjson"')
+        rows = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Visit', 'Caf\u00e9 trip'])
+        self.assertEqual(sorted(rows[1]['tags']), ['family', 'travel'])
+        self.assertEqual(rows[1]['description'], 'Line one\nline "two"')
+        self.assertEqual((rows[0]['color'], rows[0]['tags']), (None, []))
+        self.assertEqual(list(rows[0]), list(EXPORT_FIELDS))
+
+    def test_csv_round_trips_through_import(self):
+        response, body = self.export('?file_format=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(body.decode('utf-8'))))
+        self.assertEqual([row['title'] for row in rows], ['Visit', 'Caf\u00e9 trip'])
+        self.assertEqual(sorted(rows[1]['tags'].split(CSV_TAG_SEPARATOR)), ['family', 'travel'])
+
+        Event.objects.filter(user=self.user).delete()
+        upload = SimpleUploadedFile('events.csv', body)
+        report = self.client.post('/api/v1/events/import/', {'file': upload}).json()
+        self.assertEqual((report['created'], report['failed']), (2, 0))
+        event = Event.objects.get(user=self.user, week_index=3)
+        self.assertEqual((event.description, event.color), ('Line one\nline "two"', '#ef4444'))
+        self.assertEqual(sorted(event.tags.values_list('name', flat=True)), ['family', 'travel'])
+
+    def test_gzip_stream(self):
+        _, plain = self.export('?file_format=csv')
+        response, body = self.export('?file_format=csv&compression=gzip')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="events.csv.gz"')
+        self.assertEqual(gzip.decompress(body), plain)
+
+    def test_blocks_and_validation(self):
+        blocks = iter_blocks([b'ab', b'c', b'de', b'f'], block_size=3)
+        self.assertEqual(list(blocks), [b'abc', b'def'])
+        self.assertEqual(list(iter_blocks([b'abcd', b'e'], block_size=3)), [b'abcd', b'e'])
+        for query in ('?file_format=xml', '?compression=zip'):
+            response = self.client.get(f'/api/v1/events/export/{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+
+class ImportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('importer', 'importer@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content):
+        upload = SimpleUploadedFile(name, content)
+        response = self.client.post('/api/v1/events/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_ndjson(self):
+        report = self.upload('events.ndjson', (
+            b'{"week_index": 1, "day_of_week": 2, "title": "Caf\xc3\xa9", "icon": "cup",'
+            b' "tags": ["food"]}\n'
+            b'\n'
+            b'{"week_index": -1, "day_of_week": 2, "title": "Bad", "icon": "x"}\n'
+            b'not json\n'
+            b'{"week_index": 3, "day_of_week": 0, "title": "\xff\xfe", "icon": "x"}\n'
+            b'[1]\n'
+        ))
+        self.assertEqual((report['rows'], report['created'], report['failed']), (5, 1, 4))
+        self.assertEqual([error['line'] for error in report['errors']], [3, 4, 5, 6])
+        self.assertIn('week_index', report['errors'][0]['errors'])
+        self.assertTrue(report['errors'][2]['errors'].startswith('Invalid UTF-8'))
+        event = Event.objects.get(user=self.user)
+        self.assertEqual(event.title, 'Caf\u00e9')
+        self.assertEqual(list(event.tags.values_list('name', flat=True)), ['food'])
+
+    def test_csv(self):
+        report = self.upload('events.csv', (
+            b'week_index,day_of_week,title,description,icon,color,tags\n'
+            b'1,2,Trip,"Two\nlines",plane,,travel;family\n'
+            b'2,9,Bad day,,x,,\n'
+            b'3,1,\xff,,x,,\n'
+            b'4,1,"' + b'x' * (csv.field_size_limit() + 1) + b'",,x,,\n'
+            b'5,3,Last,,flag,#ef4444,\n'
+        ))
+        self.assertEqual((report['created'], report['failed']), (2, 3))
+        self.assertEqual([error['line'] for error in report['errors']], [4, 5, 6])
+        self.assertTrue(report['errors'][1]['errors'].startswith('Invalid UTF-8'))
+        self.assertTrue(report['errors'][2]['errors'].startswith('Invalid CSV'))
+        trip = Event.objects.get(user=self.user, title='Trip')
+        self.assertEqual(trip.description, 'Two\nlines')
+        self.assertEqual(sorted(trip.tags.values_list('name', flat=True)), ['family', 'travel'])
+
+    def test_requires_known_format(self):
+        upload = SimpleUploadedFile('events.txt', b'')
+        response = self.client.post('/api/v1/events/import/?file_format=xml', {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/api/v1/events/import/').status_code, 400)
+
+
+class UserStatsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('counter', 'counter@example.com', 'secret-pass-1')
+        self.tag = Tag.objects.create(user=self.user, name='work')
+
+    def add_event(self, week):
+        event = Event.objects.create(
+            user=self.user, week_index=week, day_of_week=0, title='Shift', icon='star'
+        )
+        event.tags.add(self.tag)
+        return event
+
+    def test_fresh_without_the_response_cache(self):
+        self.add_event(1)
+        self.assertEqual(get_user_stats(self.user).total_events, 1)
+        # Another process's write bumps nothing in this process's cache, and
+        # an evicted data version must not force a recompute.
+        with mock.patch('life_cubes.signals.bump_data_version'):
+            event = self.add_event(60)
+        caches['responses'].clear()
+        stats = get_user_stats(self.user)
+        self.assertEqual((stats.total_events, stats.last_week), (2, 60))
+        self.assertEqual(stats.tags[0]['count'], 2)
+        with self.assertNumQueries(1):
+            get_user_stats(self.user)
+
+        event.delete()
+        self.tag.refresh_from_db()
+        self.tag.name = 'job'
+        self.tag.save()
+        stats = get_user_stats(self.user)
+        self.assertEqual((stats.total_events, stats.tags[0]['name']), (1, 'job'))
+        self.assertEqual(async_to_sync(aget_user_stats)(self.user).total_events, 1)
+
+    def test_write_during_recompute_leaves_stats_stale(self):
+        version = UserStats.objects.get(pk=self.user.pk).version
+        self.add_event(1)
+        # computed as of the counter read before the write
+        refresh_user_stats(self.user.pk, version)
+        self.assertTrue(UserStats.objects.get(pk=self.user.pk).is_stale)
+        self.assertEqual(get_user_stats(self.user).total_events, 1)
+
+
+class LifeCalendarTests(TestCase):
+
+    def test_week_date_round_trip(self):
+        birth_date = date(2000, 2, 29)
+        for week in (0, 1, 51, 52, 519, 520, MAX_WEEK_INDEX):
+            start, end = weeks_to_dates(birth_date, [week])[0]
+            self.assertEqual(date_to_week(birth_date, start), week)
+            self.assertEqual(date_to_week(birth_date, end), week)
+        # the last week of a year runs up to the next birthday
+        self.assertEqual(week_end(birth_date, 51), date(2001, 2, 27))
+        self.assertIsNone(date_to_week(birth_date, date(2000, 2, 28)))
+
+    def test_calendar_endpoint(self):
+        user = User.objects.create_user('planner', 'planner@example.com', 'secret-pass-1')
+        profile = UserProfile.objects.create(user=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/v1/calendar/').status_code, 400)
+
+        profile.birth_date = date(1990, 5, 17)
+        profile.save()
+        response = client.get('/api/v1/calendar/?weeks=52&dates=2000-05-17')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['week_dates'][0]['start_date'], '1991-05-17')
+        self.assertEqual(response.json()['date_weeks'][0]['week'], 520)
+
+
+class SyntheticDataTests(TestCase):
+
+    def test_seed_is_reproducible(self):
+        today = date(2026, 1, 1)
+        seed_synthetic(3, 40, seed=7, prefix='a-', today=today)
+        seed_synthetic(3, 40, seed=7, prefix='b-', today=today)
+        for number in range(3):
+            first, second = (
+                list(Event.objects.filter(user__username=f'{prefix}{number}').order_by('id')
+                     .values_list('week_index', 'day_of_week', 'title'))
+                for prefix in ('a-', 'b-')
+            )
+            self.assertEqual(first, second)
+        weeks = Event.objects.values_list('week_index', flat=True)
+        self.assertTrue(all(0 <= week <= MAX_WEEK_INDEX for week in weeks))
+        self.assertTrue(self.client.login(username='a-0', password='synthetic-pass-1'))
+
+
+class BenchmarkTests(TestCase):
+
+    def test_run_and_compare(self):
+        results = run_benchmarks(
+            ['event_serialize_100', 'exception_handler'],
+            round_seconds=0.001, rounds=1, fixture_events=20,
+        )
+        self.assertGreater(results['exception_handler']['ops_per_sec'], 0)
+        self.assertGreater(results['event_serialize_100']['peak_bytes'], 0)
+
+        baseline = {name: dict(values) for name, values in results.items()}
+        self.assertEqual(find_regressions(results, baseline), {})
+        baseline['exception_handler']['ops_per_sec'] *= 2
+        self.assertEqual(list(find_regressions(results, baseline)), ['exception_handler'])
+
+
+class SparseFieldsTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('sparse', 'sparse@example.com', 'secret-pass-1')
+        UserProfile.objects.create(user=self.user, birth_date=date(1990, 1, 1))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        tag = Tag.objects.create(user=self.user, name='work')
+        self.event = Event.objects.create(
+            user=self.user, week_index=3, day_of_week=1, title='Job', description='Long text',
+            icon='star',
+        )
+        self.event.tags.add(tag)
+
+    def test_event_list_fields(self):
+        fields = 'id,week_index,day_of_week,icon,color'
+        # fingerprint and events, no tag query
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/events/?fields={fields}')
+        self.assertEqual(list(response.json()[0]), fields.split(','))
+
+        response = self.client.get('/api/v1/events/?fields=id,tags.name&omit=id')
+        self.assertEqual(response.json(), [{'tags': [{'name': 'work'}]}])
+
+    def test_event_page_defers_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/events/?page_size=10&omit=description,tags')
+        self.assertNotIn('description', response.json()['results'][0])
+        self.assertFalse(any('description' in query['sql'] for query in queries))
+
+    def test_event_detail_omits_profile(self):
+        url = f'/api/v1/events/{self.event.pk}/'
+        # fingerprint and the event joined with its owner only
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{url}?omit=user.profile,tags')
+        self.assertEqual(response.json()['user']['username'], 'sparse')
+        self.assertNotIn('profile', response.json()['user'])
+
+    def test_tag_and_user_fields(self):
+        response = self.client.get('/api/v1/tags/?fields=name')
+        self.assertEqual(response.json()['results'], [{'name': 'work'}])
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/auth/user/?omit=profile')
+        self.assertNotIn('profile', response.json())
+        response = self.client.get('/api/v1/auth/user/?fields=username,profile.birth_date')
+        self.assertEqual(
+            response.json(), {'username': 'sparse', 'profile': {'birth_date': '1990-01-01'}}
+        )
+
+
+class WeekRangesTests(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('viewer', 'viewer@example.com', 'secret-pass-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for week in (0, 5, 60, 61, 600, MAX_WEEK_INDEX):
+            Event.objects.create(
+                user=self.user, week_index=week, day_of_week=0, title=f'Week {week}', icon='star'
+            )
+
+    def test_merged_ranges_grouped_by_week(self):
+        # fingerprint, events, their tags
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                '/api/v1/events/week_ranges/?ranges=50-70,0-5,55-60,-10-2&weeks=600,601'
+            )
+        data = response.json()
+        self.assertEqual(data['ranges'], [[0, 5], [50, 70], [600, 601]])
+        self.assertEqual(list(data['weeks']), ['0', '5', '60', '61', '600'])
+        self.assertEqual(data['weeks']['60'][0]['title'], 'Week 60')
+
+        path = f'/api/v1/events/week_ranges/?weeks={MAX_WEEK_INDEX}&fields=title'
+        response = self.client.get(path)
+        self.assertEqual(
+            response.json()['weeks'], {str(MAX_WEEK_INDEX): [{'title': f'Week {MAX_WEEK_INDEX}'}]}
+        )
+
+    def test_validation(self):
+        for query in ('', 'ranges=a-b', 'ranges=9-3', 'weeks=1.5'):
+            response = self.client.get(f'/api/v1/events/week_ranges/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+        response = self.client.get('/api/v1/events/week_range/?start_week=a&end_week=3')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+PRUNE_BATCH_SIZE = 5000
+
+
+class BlacklistCache:
+    """
+    Bounded LRU set of token ids known to be blacklisted.
+
+    Only positive answers are cached: a blacklisted token stays blacklisted,
+    whereas a "not blacklisted" answer can be invalidated at any time by
+    another worker, so misses always fall through to the database.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._jtis = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        with self._lock:
+            if jti in self._jtis:
+                self._jtis.move_to_end(jti)
+                return True
+            return False
+
+    def add(self, jti):
+        with self._lock:
+            self._jtis[jti] = None
+            self._jtis.move_to_end(jti)
+            while len(self._jtis) > self.max_size:
+                self._jtis.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._jtis.clear()
+
+
+blacklist_cache = BlacklistCache(getattr(settings, 'TOKEN_BLACKLIST_CACHE_SIZE', 10000))
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """Refresh token whose blacklist check is fronted by ``blacklist_cache``."""
+
+    def check_blacklist(self):
+        jti = self.payload[jwt_settings.JTI_CLAIM]
+        if jti in blacklist_cache:
+            raise TokenError('Token is blacklisted')
+        try:
+            super().check_blacklist()
+        except TokenError:
+            blacklist_cache.add(jti)
+            raise
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_cache.add(self.payload[jwt_settings.JTI_CLAIM])
+        return result
+
+
+class CachedBlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+
+def prune_expired_tokens(batch_size=PRUNE_BATCH_SIZE, now=None):
+    """
+    Delete expired outstanding tokens and their blacklist entries in batches
+    of ``batch_size``, each in its own short transaction. Returns the number
+    of deleted outstanding and blacklisted rows.
+    """
+    now = now or timezone.now()
+    deleted = {'outstanding': 0, 'blacklisted': 0}
+    expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by('expires_at')
+    while True:
+        ids = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            outstanding, _ = OutstandingToken.objects.filter(pk__in=ids).delete()
+        deleted['blacklisted'] += blacklisted
+        deleted['outstanding'] += outstanding
+
+
+class TokenPruneScheduler(threading.Thread):
+    """Daemon thread that runs ``prune_expired_tokens`` every ``interval`` seconds."""
+
+    def __init__(self, interval, batch_size=PRUNE_BATCH_SIZE):
+        super().__init__(name='token-prune-scheduler', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            started = time.perf_counter()
+            try:
+                deleted = prune_expired_tokens(self.batch_size)
+            except Exception:
+                logger.exception('Pruning expired tokens failed')
+            else:
+                logger.info(
+                    'Pruned %s outstanding and %s blacklisted tokens in %.2fs',
+                    deleted['outstanding'], deleted['blacklisted'], time.perf_counter() - started,
+                )
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stopped.set()
+
+
+_scheduler = None
+
+
+def start_token_pruning():
+    """Start the pruning thread once per process if ``TOKEN_PRUNE_INTERVAL`` is set."""
+    global _scheduler
+    interval = getattr(settings, 'TOKEN_PRUNE_INTERVAL', 0)
+    if interval and _scheduler is None:
+        _scheduler = TokenPruneScheduler(interval)
+        _scheduler.start()
+    return _scheduler
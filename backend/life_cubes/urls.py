@@ -1,6 +1,8 @@
 from django.urls import path, include
 from django.contrib import admin
 from rest_framework.routers import DefaultRouter
+from . import async_views
+from .metrics import metrics_view
 from .views import (
     UserProfileViewSet,
     TagViewSet,
@@ -8,6 +10,7 @@ from .views import (
     CustomTokenObtainPairView,
     CustomTokenRefreshView,
     DashboardView,
+    CalendarView,
     UserDetailView,
     register,
     logout_view,
@@ -25,6 +28,9 @@ router.register(r'events', EventViewSet, basename='event')
 urlpatterns = [
     # Admin site
     path('admin/', admin.site.urls),
+
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
     
     # Auth endpoints
     path('api/v1/auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -37,7 +43,19 @@ urlpatterns = [
     
     # Dashboard endpoint
     path('api/v1/dashboard/', DashboardView.as_view(), name='dashboard'),
+
+    # Life calendar endpoint
+    path('api/v1/calendar/', CalendarView.as_view(), name='calendar'),
     
+    # Async read endpoints, for ASGI deployments
+    path('api/v1/async/events/', async_views.event_list, name='async-event-list'),
+    path(
+        'api/v1/async/events/week_range/', async_views.event_week_range,
+        name='async-event-week-range',
+    ),
+    path('api/v1/async/events/grid/', async_views.event_grid, name='async-event-grid'),
+    path('api/v1/async/dashboard/', async_views.dashboard, name='async-dashboard'),
+
     # API endpoints
     path('api/v1/', include((router.urls, 'api_v1'))),
 ]
\ No newline at end of file
@@ -3,6 +3,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.core.exceptions import PermissionDenied
+import logging
+
+logger = logging.getLogger(__name__)
 
 def custom_exception_handler(exc, context):
     # Call REST framework's default exception handler first
@@ -10,6 +13,7 @@ def custom_exception_handler(exc, context):
 
     if response is None:
         if isinstance(exc, Exception):
+            logger.exception('Unhandled API error', exc_info=exc)
             data = {
                 'error': str(exc),
                 'detail': 'An unexpected error occurred.'
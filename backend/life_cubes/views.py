@@ -1,7 +1,8 @@
 from django.shortcuts import render
-from rest_framework import viewsets, filters, status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework import viewsets, filters, serializers, status
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -9,13 +10,50 @@ from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from .models import UserProfile, Tag, Event
+from django.utils.dateparse import parse_date
+from .models import UserProfile, Tag, Event, MAX_WEEK_INDEX
+from .pagination import EventKeysetPagination
+from .fieldsets import FieldSelection, defer_unselected
+from .export import EXPORT_FORMATS, export_events
+from .importers import IMPORT_FORMATS, import_events
+from .search import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, EventSearchFilter, search_event_ids
+from .grid import build_grid_summary, grid_summary_to_json
+from .aggregates import AGGREGATE_GROUP_NAMES, aggregate_events, filter_by_tags
+from .cache import cache_user_response
+from .conditional import conditional_user_response
+from .tokens import CachedBlacklistTokenRefreshSerializer
+from .stats import get_user_stats
+from .suggest import SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT, suggest_tags
+from .sync import (
+    CHANGES_DEFAULT_LIMIT,
+    CHANGES_MAX_LIMIT,
+    UPSERT,
+    InvalidCursor,
+    collect_changes,
+    cursor_expired,
+    decode_cursor,
+    encode_cursor,
+)
+from .bulk import (
+    BULK_MAX_EVENTS,
+    bulk_create_events,
+    bulk_delete_events,
+    bulk_update_events,
+    parse_event_ids,
+)
+from .renderers import FastJSONRenderer, GridBinaryRenderer
+from .projections import project_events
+from .life_calendar import (
+    calendar_summary, date_range_to_week_range, dates_to_weeks, week_start, weeks_to_dates,
+)
 from .serializers import (
     UserProfileSerializer,
     TagSerializer,
     EventSerializer,
+    EventListSerializer,
     UserSerializer
 )
 from rest_framework.views import APIView
@@ -23,10 +61,13 @@ from rest_framework_simplejwt.exceptions import TokenError
 from django.conf import settings
 from datetime import datetime
 from django.middleware.csrf import get_token
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.cache import never_cache
+import logging
+
+logger = logging.getLogger(__name__)
 
 def set_auth_cookies(response, access_token, refresh_token):
     """Helper function to set authentication cookies"""
@@ -116,13 +157,15 @@ class CustomTokenObtainPairView(TokenObtainPairView):
                 )
                 
         except Exception as e:
-            print("Login error:", str(e))
+            logger.exception('Login failed')
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
 class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CachedBlacklistTokenRefreshSerializer
+
     def post(self, request, *args, **kwargs):
         try:
             # Get refresh token from cookie
@@ -253,7 +296,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     def me(self, request):
         """Get current user's profile with user data"""
         user = request.user
-        serializer = UserSerializer(user)
+        serializer = UserSerializer(user, context={'request': request})
         return Response(serializer.data)
 
 class TagViewSet(viewsets.ModelViewSet):
@@ -264,21 +307,91 @@ class TagViewSet(viewsets.ModelViewSet):
     search_fields = ['name']
 
     def get_queryset(self):
-        return Tag.objects.filter(events__user=self.request.user).distinct()
+        queryset = Tag.objects.filter(user=self.request.user)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return defer_unselected(queryset, TagSerializer, FieldSelection.from_request(self.request))
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @conditional_user_response('tags')
+    @cache_user_response('tags')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Autocomplete tag names by prefix, most used first."""
+        try:
+            limit = int(request.query_params.get('limit', SUGGEST_DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(max(limit, 1), SUGGEST_MAX_LIMIT)
+        prefix = request.query_params.get('prefix', '').strip()
+        return Response(suggest_tags(request.user, prefix, limit))
 
 class EventViewSet(viewsets.ModelViewSet):
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, filters.OrderingFilter]
     filterset_fields = ['week_index', 'day_of_week']
-    search_fields = ['title', 'description', 'tags__name']
     ordering_fields = ['week_index', 'day_of_week', 'created_at']
     ordering = ['week_index', 'day_of_week']
-    pagination_class = None  # Disable pagination for this viewset
+    pagination_class = EventKeysetPagination  # Only paginates when asked for a cursor or page_size
+    list_actions = ('list', 'week_range', 'week_ranges', 'search')
+
+    def get_field_selection(self):
+        """``?fields=`` / ``?omit=`` of reads; writes always load full rows."""
+        if self.request.method not in SAFE_METHODS:
+            return FieldSelection()
+        return FieldSelection.from_request(self.request)
 
     def get_queryset(self):
-        """Get events for the current user."""
-        return Event.objects.filter(user=self.request.user)
+        """
+        Get events for the current user, with the related rows the response
+        renders preloaded and the columns it leaves out deferred.
+        """
+        selection = self.get_field_selection()
+        queryset = defer_unselected(
+            Event.objects.for_user(self.request.user), self.get_serializer_class(), selection
+        )
+        if selection.includes('tags'):
+            queryset = queryset.with_tags()
+        if self.action not in self.list_actions and selection.includes('user'):
+            related = ['user']
+            if selection.nested('user').includes('profile'):
+                related.append('user__profile')
+            queryset = queryset.select_related(*related)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action in self.list_actions:
+            return EventListSerializer
+        return super().get_serializer_class()
+
+    def list_response(self, queryset):
+        """
+        Serialize a page of ``queryset``, or project the whole list straight
+        from ``values()`` rows when no page was asked for.
+        """
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(project_events(queryset, self.get_field_selection()))
+
+    @conditional_user_response('events')
+    @cache_user_response('events')
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    @conditional_user_response('event')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         """Create a new event for the current user."""
@@ -292,46 +405,396 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer.save()
 
     @action(detail=False, methods=['get'])
+    @conditional_user_response('week_range')
+    @cache_user_response('week_range')
     def week_range(self, request):
         """Get events within a specific week range."""
         start_week = request.query_params.get('start_week', None)
         end_week = request.query_params.get('end_week', None)
+        start_date = request.query_params.get('start_date', None)
+        end_date = request.query_params.get('end_date', None)
 
-        if not all([start_week, end_week]):
+        if start_date or end_date:
+            # Date ranges are translated to week indices so the query stays on the index
+            birth_date = get_birth_date(request.user)
+            if birth_date is None:
+                return Response(
+                    {"error": "A birth date is required to query by date"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                start, end = parse_dates([start_date or '', end_date or ''])
+            except ValueError:
+                return Response(
+                    {"error": "start_date and end_date must be YYYY-MM-DD dates"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            weeks = date_range_to_week_range(birth_date, start, end)
+            if weeks is None:
+                return Response([])
+            start_week, end_week = weeks
+        elif not all([start_week, end_week]):
             return Response(
                 {"error": "Both start_week and end_week parameters are required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        else:
+            try:
+                start_week, end_week = int(start_week), int(end_week)
+            except ValueError:
+                return Response(
+                    {"error": "start_week and end_week must be integers"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
         queryset = self.get_queryset().filter(
             week_index__gte=start_week,
             week_index__lte=end_week
         )
-        serializer = self.get_serializer(queryset, many=True)
+        return self.list_response(queryset)
+
+    @action(detail=False, methods=['get'])
+    @conditional_user_response('week_ranges')
+    @cache_user_response('week_ranges')
+    def week_ranges(self, request):
+        """
+        Get the events of several week ranges at once, grouped by week.
+
+        ``ranges`` takes comma separated ``start-end`` pairs and ``weeks``
+        comma separated week indices, e.g. ``?ranges=0-51,520-1039&weeks=2000``.
+        Overlapping ranges are merged and clipped to the grid, and all of
+        them are read with a single query.
+        """
+        try:
+            ranges = parse_week_ranges(
+                request.query_params.get('ranges', ''),
+                request.query_params.get('weeks', ''),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not ranges:
+            return Response(
+                {'error': 'At least one of ranges or weeks is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ranges = merge_week_ranges(ranges)
+        if not ranges:
+            return Response({'ranges': [], 'weeks': {}})
+        queryset = self.get_queryset().filter(week_ranges_q(ranges))
+        queryset = queryset.order_by(*EventKeysetPagination.ordering)
+        selection = self.get_field_selection()
+        events = project_events(queryset, selection.with_field('week_index'))
+
+        weeks = {}
+        keep_week = selection.includes('week_index')
+        for event in events:
+            week = event['week_index'] if keep_week else event.pop('week_index')
+            weeks.setdefault(str(week), []).append(event)
+        return Response({'ranges': ranges, 'weeks': weeks})
+
+    @action(detail=False, methods=['get'], renderer_classes=[FastJSONRenderer, GridBinaryRenderer])
+    @conditional_user_response('grid')
+    @cache_user_response('grid')
+    def grid(self, request):
+        """
+        Get a dense per-week summary of the whole life grid.
+
+        Returns event counts, day-of-week bitmasks and dominant color/icon ids
+        for every week. Request ``application/octet-stream`` (or
+        ``?format=bin``) for the packed binary encoding.
+        """
+        summary = build_grid_summary(Event.objects.for_user(request.user))
+        if request.accepted_renderer.format != GridBinaryRenderer.format:
+            summary = grid_summary_to_json(summary)
+        return Response(summary)
+
+    @action(detail=False, methods=['get'], url_path=r'aggregate/(?P<group>[a-z_]+)')
+    @conditional_user_response('aggregate')
+    @cache_user_response('aggregate')
+    def aggregate(self, request, group=None):
+        """
+        Count events per week, year, decade, day_of_week or tag.
+
+        Optional filters: ``tags`` (comma separated names), ``start_week`` /
+        ``end_week`` and ``start_date`` / ``end_date``.
+        """
+        if group not in AGGREGATE_GROUP_NAMES:
+            return Response(
+                {'error': f'group must be one of: {", ".join(AGGREGATE_GROUP_NAMES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        params = request.query_params
+        queryset = Event.objects.for_user(request.user)
+
+        tags = [name for name in params.get('tags', '').split(',') if name]
+        if tags:
+            queryset = filter_by_tags(queryset, tags)
+
+        try:
+            start_week = int(params['start_week']) if params.get('start_week') else None
+            end_week = int(params['end_week']) if params.get('end_week') else None
+        except ValueError:
+            return Response(
+                {'error': 'start_week and end_week must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if params.get('start_date') or params.get('end_date'):
+            birth_date = get_birth_date(request.user)
+            if birth_date is None:
+                return Response(
+                    {'error': 'A birth date is required to filter by date'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                start, end = parse_dates([params.get('start_date'), params.get('end_date')])
+            except ValueError:
+                return Response(
+                    {'error': 'start_date and end_date must be YYYY-MM-DD dates'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            weeks = date_range_to_week_range(birth_date, start, end)
+            if weeks is None:
+                return Response({'group': group, 'buckets': []})
+            start_week = max(weeks[0], start_week) if start_week is not None else weeks[0]
+            end_week = min(weeks[1], end_week) if end_week is not None else weeks[1]
+        if start_week is not None:
+            queryset = queryset.filter(week_index__gte=start_week)
+        if end_week is not None:
+            queryset = queryset.filter(week_index__lte=end_week)
+
+        return Response({'group': group, 'buckets': aggregate_events(queryset, group)})
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search over titles, descriptions and tags, best match first.
+
+        Every word in ``q`` must match the start of a word in the event.
+        """
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= SEARCH_MAX_LIMIT:
+            return Response(
+                {"error": f"limit must be between 1 and {SEARCH_MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = search_event_ids(request.user, query, limit)
+        events = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([events[pk] for pk in ids if pk in events], many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Get created, updated and deleted events since a sync cursor.
+
+        Omit ``since`` for a full sync. Pass the returned ``cursor`` as
+        ``since`` to continue; ``has_more`` tells whether another page is
+        waiting. A cursor older than a pruned tombstone gets a 410 and the
+        client must do a full sync. The most recent few seconds of changes
+        are held back until their writes have surely committed.
+        """
+        since = request.query_params.get('since')
+        try:
+            position = decode_cursor(since) if since else None
+            limit = int(request.query_params.get('limit', CHANGES_DEFAULT_LIMIT))
+        except (InvalidCursor, ValueError):
+            return Response(
+                {"error": "Invalid since or limit parameter"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= limit <= CHANGES_MAX_LIMIT:
+            return Response(
+                {"error": f"limit must be between 1 and {CHANGES_MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if position is not None and cursor_expired(request.user, position):
+            return Response(
+                {"error": "The cursor has expired, do a full sync without since",
+                 "code": "resync_required"},
+                status=status.HTTP_410_GONE
+            )
+
+        changes, next_position, has_more = collect_changes(request.user, position, limit)
+        events = [obj for _, kind, obj in changes if kind == UPSERT]
+        serialized = iter(EventListSerializer(events, many=True).data)
+        data = []
+        for _, kind, obj in changes:
+            if kind == UPSERT:
+                created = position is None or obj.created_at > position[0]
+                data.append({
+                    'type': 'created' if created else 'updated',
+                    'event': next(serialized),
+                })
+            else:
+                data.append({'type': 'deleted', 'id': obj.event_id})
+
+        return Response({
+            'changes': data,
+            'cursor': encode_cursor(next_position) if next_position else None,
+            'has_more': has_more,
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the user's full event history as a file download.
+
+        ``file_format`` is ``ndjson`` (default) or ``csv``; pass
+        ``compression=gzip`` to gzip the stream on the fly.
+        """
+        file_format = request.query_params.get('file_format', 'ndjson')
+        compression = request.query_params.get('compression')
+        if file_format not in EXPORT_FORMATS or compression not in (None, 'gzip'):
+            return Response(
+                {"error": f"file_format must be one of {', '.join(EXPORT_FORMATS)} "
+                          "and compression must be gzip"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        chunks, content_type, filename = export_events(
+            Event.objects.for_user(request.user), file_format, compress=compression == 'gzip'
+        )
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_events(self, request):
+        """
+        Import events from an uploaded NDJSON or CSV ``file``.
+
+        Valid rows are committed in batches; the response reports per-batch
+        throughput and the rows that failed validation.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {"error": "A file upload is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        default_format = 'csv' if upload.name.endswith('.csv') else 'ndjson'
+        file_format = request.query_params.get('file_format', default_format)
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of {', '.join(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        report = import_events(request.user, upload, file_format)
+        return Response(report.as_dict(), status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request):
+        """
+        Create, update or delete many events in one transaction.
+
+        POST takes a list of events, PATCH a list of partial events that
+        each carry an ``id``, and DELETE an object with a list of ``ids``.
+        """
+        items = request.data
+        if request.method == 'DELETE':
+            if not isinstance(items, dict):
+                return Response(
+                    {"error": "Expected an object with a list of ids"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            items = items.get('ids')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Expected a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > BULK_MAX_EVENTS:
+            return Response(
+                {"error": f"At most {BULK_MAX_EVENTS} events can be processed at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'POST':
+            serializer = EventSerializer(data=items, many=True)
+            serializer.is_valid(raise_exception=True)
+            events = bulk_create_events(request.user, serializer.validated_data)
+        elif request.method == 'PATCH':
+            events = self._bulk_update(request, items)
+            if isinstance(events, Response):
+                return events
+        else:
+            try:
+                ids = parse_event_ids(items)
+            except serializers.ValidationError as exc:
+                return Response(
+                    {"error": "ids must be integers", "ids": exc.detail},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            deleted = bulk_delete_events(Event.objects.for_user(request.user), ids)
+            return Response({'deleted': deleted})
+
+        queryset = Event.objects.filter(pk__in=[event.pk for event in events]).with_tags()
+        data = EventListSerializer(queryset, many=True).data
+        return Response(
+            data,
+            status=status.HTTP_201_CREATED if request.method == 'POST' else status.HTTP_200_OK
+        )
+
+    def _bulk_update(self, request, items):
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        try:
+            ids = parse_event_ids(ids)
+        except serializers.ValidationError as exc:
+            return Response(
+                {"error": "Every event needs an integer id", "ids": exc.detail},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        events = Event.objects.for_user(request.user).in_bulk(ids)
+        missing = [pk for pk in ids if pk not in events]
+        if missing:
+            return Response(
+                {"error": "Events not found", "ids": missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        updates = []
+        errors = []
+        for pk, item in zip(ids, items):
+            serializer = EventSerializer(events[pk], data=item, partial=True)
+            if serializer.is_valid():
+                updates.append((events[pk], serializer.validated_data))
+                errors.append({})
+            else:
+                errors.append(serializer.errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return bulk_update_events(request.user, updates)
+
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @conditional_user_response('dashboard')
+    @cache_user_response('dashboard')
     def get(self, request):
         user = request.user
-        # Get user's profile
         try:
-            profile = user.profile
-            # Get recent events
-            recent_events = Event.objects.filter(user=user).order_by('-created_at')[:5]
-            # Get all tags
-            tags = Tag.objects.filter(user=user)
-            
+            stats = get_user_stats(user)
+            recent_events = Event.objects.for_user(user).with_tags().order_by('-created_at')[:5]
+
             data = {
                 'user': {
                     'username': user.username,
                     'email': user.email,
                 },
-                'recent_events': EventSerializer(recent_events, many=True).data,
-                'tags': TagSerializer(tags, many=True).data,
-                'total_events': Event.objects.filter(user=user).count(),
-                'total_tags': tags.count(),
+                'recent_events': EventListSerializer(recent_events, many=True).data,
+                'tags': stats.tags,
+                'total_events': stats.total_events,
+                'total_tags': stats.total_tags,
+                'first_week': stats.first_week,
+                'last_week': stats.last_week,
+                'events_per_year': stats.events_per_year,
             }
             return Response(data)
         except Exception as e:
@@ -340,6 +803,138 @@ class DashboardView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+def get_birth_date(user):
+    return UserProfile.objects.filter(user=user).values_list('birth_date', flat=True).first()
+
+
+# Ranges and single weeks accepted by one week_ranges request.
+WEEK_RANGES_MAX = 200
+
+
+def parse_week_ranges(ranges, weeks):
+    """
+    Parse ``'0-51,520-1039'`` and ``'7,9'`` into ``(start, end)`` pairs,
+    single weeks becoming one-week ranges; raises ``ValueError``.
+    """
+    parsed = []
+    for value in filter(None, (item.strip() for item in ranges.split(','))):
+        # Skip a leading minus so viewports starting before the grid parse.
+        separator = value.find('-', 1)
+        start, end = (value, value) if separator < 0 else (value[:separator], value[separator + 1:])
+        try:
+            parsed.append((int(start), int(end)))
+        except ValueError:
+            raise ValueError(f"ranges must be start-end pairs of integers, got '{value}'")
+    for value in filter(None, (item.strip() for item in weeks.split(','))):
+        try:
+            parsed.append((int(value), int(value)))
+        except ValueError:
+            raise ValueError(f"weeks must be integers, got '{value}'")
+    if len(parsed) > WEEK_RANGES_MAX:
+        raise ValueError(f'At most {WEEK_RANGES_MAX} ranges and weeks can be requested at once')
+    for start, end in parsed:
+        if start > end:
+            raise ValueError(f'Range {start}-{end} ends before it starts')
+    return parsed
+
+
+def merge_week_ranges(ranges):
+    """Clip ``(start, end)`` pairs to the grid and merge overlapping or adjacent ones."""
+    merged = []
+    for start, end in sorted(ranges):
+        start, end = max(start, 0), min(end, MAX_WEEK_INDEX)
+        if start > end:
+            continue
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def week_ranges_q(ranges):
+    """One condition covering all merged ranges, served by the ``(user, week_index)`` index."""
+    single_weeks = [start for start, end in ranges if start == end]
+    condition = Q(week_index__in=single_weeks) if single_weeks else Q()
+    for start, end in ranges:
+        if start != end:
+            condition |= Q(week_index__gte=start, week_index__lte=end)
+    return condition
+
+
+def parse_dates(values):
+    """Parse ISO dates, leaving blanks as ``None``; raises ``ValueError``."""
+    dates = []
+    for value in values:
+        if not value:
+            dates.append(None)
+            continue
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValueError(value)
+        dates.append(parsed)
+    return dates
+
+
+class CalendarView(APIView):
+    """
+    Life-calendar boundaries for the user's birth date. ``?weeks=`` (comma
+    separated week indices) and ``?dates=`` (comma separated ISO dates) are
+    converted in both directions; ``?include=weeks`` adds every week start.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        birth_date = get_birth_date(request.user)
+        if birth_date is None:
+            return Response(
+                {'error': 'Set a birth date to use the calendar'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = calendar_summary(birth_date)
+        weeks = request.query_params.get('weeks')
+        if weeks:
+            try:
+                weeks = [int(week) for week in weeks.split(',')]
+            except ValueError:
+                return Response(
+                    {'error': 'weeks must be integers'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if any(week < 0 or week > MAX_WEEK_INDEX for week in weeks):
+                return Response(
+                    {'error': f'weeks must be between 0 and {MAX_WEEK_INDEX}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data['week_dates'] = [
+                {'week': week, 'start_date': start.isoformat(), 'end_date': end.isoformat()}
+                for week, (start, end) in zip(weeks, weeks_to_dates(birth_date, weeks))
+            ]
+
+        dates = request.query_params.get('dates')
+        if dates:
+            try:
+                dates = parse_dates(dates.split(','))
+            except ValueError:
+                dates = [None]
+            if None in dates:
+                return Response(
+                    {'error': 'dates must be YYYY-MM-DD dates'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data['date_weeks'] = [
+                {'date': day.isoformat(), 'week': week}
+                for day, week in zip(dates, dates_to_weeks(birth_date, dates))
+            ]
+
+        if request.query_params.get('include') == 'weeks':
+            data['week_starts'] = [
+                week_start(birth_date, week).isoformat() for week in range(MAX_WEEK_INDEX + 1)
+            ]
+        return Response(data)
+
+
 class UserDetailView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -347,9 +942,10 @@ class UserDetailView(APIView):
         # Get user with profile
         user = request.user
         try:
-            # Ensure profile exists
-            profile, created = UserProfile.objects.get_or_create(user=user)
-            serializer = UserSerializer(user)
+            serializer = UserSerializer(user, context={'request': request})
+            if serializer.field_selection.includes('profile'):
+                # Ensure profile exists
+                profile, created = UserProfile.objects.get_or_create(user=user)
             return Response(serializer.data)
         except Exception as e:
             return Response(
@@ -387,7 +983,7 @@ class UserDetailView(APIView):
                     profile_serializer.save()
 
             # Return updated user data
-            return Response(UserSerializer(user).data)
+            return Response(UserSerializer(user, context={'request': request}).data)
         except Exception as e:
             return Response(
                 {'error': f'Failed to update user data: {str(e)}'},
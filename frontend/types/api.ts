@@ -21,6 +21,7 @@ export interface UserProfile {
 export interface Tag {
     id: number;
     name: string;
+    usage_count?: number;
     created_at: string;
 }
 